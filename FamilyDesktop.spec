@@ -1,12 +1,15 @@
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
+# Services and the main window are imported lazily (importlib / inside
+# functions), so list them explicitly for the analysis.
 
 a = Analysis(
     ['src\\family_desktop\\app.py'],
     pathex=[],
     binaries=[],
     datas=[('generated', 'generated'), ('reports', 'reports'), ('exports', 'exports')],
-    hiddenimports=['family_desktop'],
+    hiddenimports=['family_desktop', *collect_submodules('family_desktop')],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,163 @@
+"""Benchmark the service layer against synthetic databases of several sizes.
+
+``python -m benchmarks.run --sizes 1000,10000,100000`` writes a JSON report to
+``benchmarks/results/``. Every size runs in its own interpreter because the
+settings and engine are bound to one database at import time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BENCHMARKS = (
+    "list_people",
+    "list_marriages",
+    "family_graph_load",
+    "find_relationship",
+    "tree_dot",
+    "generate_family_pdf",
+    "export_people_csv",
+)
+
+
+def _time(func: Callable[[], object], repeat: int) -> dict:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "seconds": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "items": len(result) if isinstance(result, (list, tuple, dict, str)) else None,
+    }
+
+
+def _worker(size: int, workdir: Path, selected: list[str], repeat: int, seed: int, pairs: int) -> dict:
+    """Build a database of ``size`` people in ``workdir`` and time the selected benchmarks."""
+    os.environ["FAMILY_DB_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    for name in ("FAMILY_ASSETS_DIR", "FAMILY_REPORT_DIR", "FAMILY_EXPORT_DIR"):
+        os.environ[name] = str(workdir / name.split("_")[1].lower())
+    # Time the services themselves, not the metrics wrappers and their log writes.
+    os.environ["FAMILY_INSTRUMENTATION"] = "0"
+    os.environ["FAMILY_METRICS_LOG"] = ""
+
+    from family_desktop.database import init_db
+    from family_desktop.services import family_graph, kinship, marriages, people, reports, tree_builder
+
+    from .synthetic import SyntheticConfig, generate
+
+    init_db()
+    started = time.perf_counter()
+    summary = generate(SyntheticConfig(size=size, seed=seed))
+    results: dict[str, dict] = {
+        "generate": {"seconds": [time.perf_counter() - started], "people": summary.people,
+                     "marriages": summary.marriages, "children": summary.children},
+    }
+
+    def graph_load():
+        family_graph.invalidate()
+        return family_graph.get_graph().labels
+
+    rng = random.Random(seed)
+    person_ids = list(range(1, summary.people + 1))
+    sample = [tuple(rng.sample(person_ids, 2)) for _ in range(pairs)] if summary.people > 1 else []
+
+    def relationships():
+        family_graph.get_graph()
+        return [kinship.find_relationship(source, target) for source, target in sample]
+
+    cases: dict[str, Callable[[], object]] = {
+        "list_people": people.list_people,
+        "list_marriages": marriages.list_marriages,
+        "family_graph_load": graph_load,
+        "find_relationship": relationships,
+        # DOT generation only, so the numbers do not depend on the Graphviz binary.
+        "tree_dot": lambda: tree_builder._build_digraph(root_marriage_id=1)[0].source,
+        "generate_family_pdf": reports.generate_family_pdf,
+        "export_people_csv": reports.export_people_csv,
+    }
+    for name in selected:
+        results[name] = _time(cases[name], repeat)
+    return {"size": size, "summary": {"people": summary.people, "marriages": summary.marriages}, "results": results}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated people counts")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pairs", type=int, default=20, help="person pairs for find_relationship")
+    parser.add_argument("--output", type=Path, help="JSON file to write (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    selected = [name for name in args.only.split(",") if name]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.worker is not None:
+        report = _worker(args.worker, args.workdir, selected, args.repeat, args.seed, args.pairs)
+        print(json.dumps(report))
+        return 0
+
+    runs = []
+    for size in (int(value) for value in args.sizes.split(",") if value):
+        with tempfile.TemporaryDirectory(prefix=f"family-bench-{size}-") as workdir:
+            command = [
+                sys.executable, "-m", "benchmarks.run", "--worker", str(size), "--workdir", workdir,
+                "--only", ",".join(selected), "--repeat", str(args.repeat), "--seed", str(args.seed),
+                "--pairs", str(args.pairs),
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True, cwd=Path(__file__).resolve().parents[1])
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr)
+                return completed.returncode
+            run = json.loads(completed.stdout.strip().splitlines()[-1])
+        runs.append(run)
+        for name, result in run["results"].items():
+            print(f"{size:>9}  {name:<22} {min(result['seconds']):9.3f}s")
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Hasil ditulis ke {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
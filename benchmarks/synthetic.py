@@ -0,0 +1,201 @@
+"""Deterministic synthetic genealogy for benchmarks.
+
+Run ``python -m benchmarks.synthetic --size 100000 --db bench.db`` to fill a
+fresh SQLite file; the same arguments always produce the same database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+from dataclasses import asdict, dataclass
+from datetime import date
+
+MALE_NAMES = (
+    "Ahmad", "Budi", "Candra", "Dedi", "Eko", "Fajar", "Gilang", "Hadi", "Irfan", "Joko",
+    "Kurniawan", "Lukman", "Muhammad", "Nanda", "Oki", "Putra", "Rizki", "Surya", "Taufik", "Yusuf",
+)
+FEMALE_NAMES = (
+    "Ani", "Bunga", "Citra", "Dewi", "Eka", "Fitri", "Gita", "Hana", "Indah", "Julia",
+    "Kartika", "Lestari", "Maya", "Nur", "Putri", "Ratna", "Sari", "Tari", "Wulan", "Zahra",
+)
+FAMILY_NAMES = (
+    "Santoso", "Wijaya", "Saputra", "Hidayat", "Pratama", "Nugroho", "Siregar", "Harahap", "Lubis",
+    "Nasution", "Hasibuan", "Sinaga", "Simanjuntak", "Kusuma", "Setiawan", "Gunawan", "Halim",
+    "Suryadi", "Rahman", "Syahputra", "Wibowo", "Firmansyah", "Ramadhan", "Purnomo",
+)
+
+
+@dataclass(slots=True)
+class SyntheticConfig:
+    size: int = 10_000
+    generations: int = 6
+    fertility: float = 3.0
+    marriage_rate: float = 0.85
+    remarriage_rate: float = 0.1
+    seed: int = 42
+    start_year: int = 1850
+
+    def people_per_founder(self) -> float:
+        """Expected number of people one founding couple grows into."""
+        growth = self.fertility * self.marriage_rate * (1 + self.remarriage_rate)
+        per_couple = self.fertility * (1 + self.marriage_rate * (1 + self.remarriage_rate))
+        return 2 + sum(growth**generation * per_couple for generation in range(self.generations))
+
+
+@dataclass(slots=True)
+class SyntheticSummary:
+    people: int = 0
+    marriages: int = 0
+    children: int = 0
+    founders: int = 0
+
+
+class _Writer:
+    """Collects rows with pre-assigned ids and flushes them with ``executemany``."""
+
+    def __init__(self, session, batch_size: int):
+        from family_desktop.models import ChildLink, Marriage, Person
+
+        self.session = session
+        self.batch_size = batch_size
+        self.tables = {"person": Person.__table__, "marriage": Marriage.__table__, "children": ChildLink.__table__}
+        self.rows: dict[str, list[dict]] = {name: [] for name in self.tables}
+        self.summary = SyntheticSummary()
+
+    def add(self, table: str, row: dict) -> None:
+        rows = self.rows[table]
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        from sqlalchemy import insert
+
+        # Parents before children so foreign keys always resolve.
+        for name, table in self.tables.items():
+            if self.rows[name]:
+                self.session.execute(insert(table), self.rows[name])
+                self.rows[name].clear()
+
+
+def generate(config: SyntheticConfig, batch_size: int = 10_000) -> SyntheticSummary:
+    """Append a synthetic population of about ``config.size`` people to the configured database.
+
+    Founding couples are added until the expected population reaches
+    ``size``; every couple then gets a fertility-driven number of children,
+    most children marry an outsider, and some marry a second time.
+    Generation stops hard at ``size`` people.
+    """
+    from sqlalchemy import func, select
+
+    from family_desktop.database import get_session
+    from family_desktop.models import Marriage, Person
+    from family_desktop.services import events
+
+    rng = random.Random(config.seed)
+    with get_session() as session:
+        writer = _Writer(session, batch_size)
+        summary = writer.summary
+        next_person = (session.scalar(select(func.max(Person.id))) or 0) + 1
+        next_marriage = (session.scalar(select(func.max(Marriage.id))) or 0) + 1
+
+        def add_person(gender: str, family: str, born: int) -> int:
+            nonlocal next_person
+            person_id = next_person
+            next_person += 1
+            first = rng.choice(MALE_NAMES if gender == "male" else FEMALE_NAMES)
+            died = born + rng.randint(45, 95)
+            writer.add(
+                "person",
+                {
+                    "id": person_id,
+                    "name": f"{first} {family}",
+                    "gender": gender,
+                    "birth_date": date(born, rng.randint(1, 12), rng.randint(1, 28)),
+                    "death_date": date(died, rng.randint(1, 12), rng.randint(1, 28)) if died < 2024 else None,
+                    "notes": None,
+                },
+            )
+            summary.people += 1
+            return person_id
+
+        def add_marriage(husband_id: int, wife_id: int, year: int) -> int:
+            nonlocal next_marriage
+            marriage_id = next_marriage
+            next_marriage += 1
+            writer.add(
+                "marriage",
+                {
+                    "id": marriage_id,
+                    "husband_id": husband_id,
+                    "wife_id": wife_id,
+                    "marriage_date": date(year, rng.randint(1, 12), rng.randint(1, 28)),
+                    "notes": None,
+                },
+            )
+            summary.marriages += 1
+            return marriage_id
+
+        founders = max(1, round(config.size / config.people_per_founder()))
+        # (marriage_id, family name, marriage year) of the couples of the current generation.
+        couples: list[tuple[int, str, int]] = []
+        for _ in range(founders):
+            family = rng.choice(FAMILY_NAMES)
+            born = config.start_year + rng.randint(-5, 5)
+            husband = add_person("male", family, born)
+            wife = add_person("female", rng.choice(FAMILY_NAMES), born + rng.randint(-3, 5))
+            couples.append((add_marriage(husband, wife, born + rng.randint(20, 30)), family, born + 25))
+        summary.founders = founders
+
+        for _ in range(config.generations):
+            next_couples: list[tuple[int, str, int]] = []
+            for marriage_id, family, year in couples:
+                count = max(0, round(rng.gauss(config.fertility, 1.2)))
+                for _ in range(count):
+                    if summary.people >= config.size:
+                        break
+                    gender = rng.choice(("male", "female"))
+                    born = year + rng.randint(1, 20)
+                    child = add_person(gender, family, born)
+                    writer.add("children", {"marriage_id": marriage_id, "child_id": child})
+                    summary.children += 1
+                    marriages = 0
+                    if rng.random() < config.marriage_rate:
+                        marriages = 2 if rng.random() < config.remarriage_rate else 1
+                    for _ in range(marriages):
+                        if summary.people >= config.size:
+                            break
+                        outsider_family = rng.choice(FAMILY_NAMES)
+                        spouse = add_person("female" if gender == "male" else "male", outsider_family, born)
+                        husband, wife = (child, spouse) if gender == "male" else (spouse, child)
+                        child_family = family if gender == "male" else outsider_family
+                        wed = born + rng.randint(18, 35)
+                        next_couples.append((add_marriage(husband, wife, wed), child_family, wed))
+            couples = next_couples
+            if not couples or summary.people >= config.size:
+                break
+        writer.flush()
+    events.publish(events.DataReloaded("synthetic"))
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="SQLite file to create or extend")
+    defaults = SyntheticConfig()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    # Settings read the environment on import, so point them at the target file first.
+    os.environ["FAMILY_DB_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    from family_desktop.database import init_db
+
+    init_db()
+    config = SyntheticConfig(**{name: getattr(args, name) for name in asdict(defaults)})
+    print(asdict(generate(config)))
+
+
+if __name__ == "__main__":
+    main()
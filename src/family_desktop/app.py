@@ -1,13 +1,9 @@
 from __future__ import annotations
 
+import multiprocessing
+import threading
 import tkinter as tk
-from tkinter import ttk
-
-from family_desktop.database import init_db
-from family_desktop.services.people import ensure_people
-from family_desktop.services.users import ensure_default_admin
-from family_desktop.ui.login import LoginFrame
-from family_desktop.ui.main import MainFrame
+from tkinter import messagebox, ttk
 
 SAMPLE_PEOPLE = [
     {"name": "Ahmad", "gender": "male", "birth_date": "1960-01-01"},
@@ -17,6 +13,16 @@ SAMPLE_PEOPLE = [
 ]
 
 
+def _prepare_database() -> None:
+    from family_desktop.database import init_db
+    from family_desktop.services.people import ensure_people
+    from family_desktop.services.users import ensure_default_admin
+
+    init_db()
+    ensure_default_admin()
+    ensure_people(SAMPLE_PEOPLE)
+
+
 class FamilyApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -25,18 +31,52 @@ class FamilyApp(tk.Tk):
         self.style = ttk.Style(self)
         self.style.theme_use("clam")
         self.current_frame: tk.Frame | None = None
-        init_db()
-        ensure_default_admin()
-        ensure_people(SAMPLE_PEOPLE)
+        self._startup_error: BaseException | None = None
+        self._show_splash()
+
+    def _show_splash(self):
+        """Paint a splash right away and prepare the database off the Tk thread."""
+        splash = ttk.Frame(self, padding=30)
+        ttk.Label(splash, text="Family Tree Desktop", font=("Segoe UI", 16, "bold")).pack(pady=(0, 10))
+        ttk.Label(splash, text="Menyiapkan database...").pack()
+        progress = ttk.Progressbar(splash, mode="indeterminate", length=240)
+        progress.pack(pady=10)
+        progress.start(15)
+        splash.pack(expand=True)
+        self.current_frame = splash
+        worker = threading.Thread(target=self._run_startup, name="family-startup", daemon=True)
+        worker.start()
+        self._wait_for_startup(worker)
+
+    def _run_startup(self):
+        try:
+            _prepare_database()
+        except Exception as exc:  # reported on the Tk thread
+            self._startup_error = exc
+
+    def _wait_for_startup(self, worker: threading.Thread):
+        if worker.is_alive():
+            self.after(30, self._wait_for_startup, worker)
+            return
+        if self._startup_error:
+            messagebox.showerror("Database", f"Gagal menyiapkan database:\n{self._startup_error}")
+            self.destroy()
+            return
         self.show_login()
 
     def show_login(self):
+        from family_desktop.ui.login import LoginFrame
+
         if self.current_frame:
             self.current_frame.destroy()
         self.current_frame = LoginFrame(self, self._on_login_success)
         self.current_frame.pack(fill="both", expand=True)
 
     def _on_login_success(self, user: dict):
+        # The main window pulls in every service module (reportlab, graphviz, PIL);
+        # importing it only after login keeps startup short.
+        from family_desktop.ui.main import MainFrame
+
         if self.current_frame:
             self.current_frame.destroy()
         self.current_frame = MainFrame(self, user)
@@ -44,6 +84,8 @@ class FamilyApp(tk.Tk):
 
 
 def main():
+    # Bulk profile PDFs render in a process pool; frozen builds need this to spawn workers.
+    multiprocessing.freeze_support()
     app = FamilyApp()
     app.mainloop()
 
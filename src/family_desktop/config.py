@@ -10,6 +10,29 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@dataclass(frozen=True, slots=True)
+class SqliteProfile:
+    """Connection pragmas applied to every SQLite connection."""
+
+    journal_mode: str
+    synchronous: str
+    cache_size: int  # negative values are KiB, as in ``PRAGMA cache_size``
+    mmap_size: int
+    busy_timeout_ms: int
+    temp_store: str
+
+
+SQLITE_PROFILES: dict[str, SqliteProfile] = {
+    # Single machine: WAL lets readers run while a write is in progress.
+    "local": SqliteProfile("WAL", "NORMAL", -64_000, 256 * 1024 * 1024, 5_000, "MEMORY"),
+    # File on a network share: WAL needs shared memory on one host, so keep the
+    # rollback journal and wait for locks instead of failing immediately.
+    "network": SqliteProfile("DELETE", "FULL", -64_000, 0, 30_000, "MEMORY"),
+    # What SQLite does out of the box.
+    "compat": SqliteProfile("DELETE", "FULL", -2_000, 0, 0, "DEFAULT"),
+}
+
+
 @dataclass(slots=True)
 class Settings:
     """Application level configuration loaded from environment variables."""
@@ -19,6 +42,31 @@ class Settings:
     assets_dir: Path = Path(os.getenv("FAMILY_ASSETS_DIR", "generated"))
     report_dir: Path = Path(os.getenv("FAMILY_REPORT_DIR", "reports"))
     export_dir: Path = Path(os.getenv("FAMILY_EXPORT_DIR", "exports"))
+    render_cache_mb: int = int(os.getenv("FAMILY_RENDER_CACHE_MB", "256"))
+    sqlite_profile_name: str = os.getenv("FAMILY_SQLITE_PROFILE", "local")
+    # PBKDF2 cost for new hashes; existing accounts are rehashed on their next login.
+    password_iterations: int = int(os.getenv("FAMILY_PASSWORD_ITERATIONS", "100000"))
+    instrumentation: bool = os.getenv("FAMILY_INSTRUMENTATION", "1") != "0"
+    # JSON-lines log of every instrumented service call; an empty value disables it.
+    metrics_log_path: str = os.getenv("FAMILY_METRICS_LOG", "logs/service-metrics.jsonl")
+
+    @property
+    def metrics_log(self) -> Path | None:
+        return Path(self.metrics_log_path) if self.metrics_log_path else None
+
+    @property
+    def sqlite_profile(self) -> SqliteProfile:
+        try:
+            return SQLITE_PROFILES[self.sqlite_profile_name]
+        except KeyError:
+            raise ValueError(
+                f"FAMILY_SQLITE_PROFILE tidak dikenal: {self.sqlite_profile_name} "
+                f"(pilihan: {', '.join(SQLITE_PROFILES)})"
+            ) from None
+
+    @property
+    def render_cache_dir(self) -> Path:
+        return self.assets_dir / "cache"
 
     @property
     def use_sqlite_fallback(self) -> bool:
@@ -1,27 +1,69 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from typing import Iterable, Iterator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config import settings
 
+# Stays well below SQLite's bound-parameter limit for ``IN (...)`` lists.
+IN_CHUNK_SIZE = 500
+
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(settings.database_url, echo=False, future=True)
+def _sqlite_pragmas(read_only: bool):
+    profile = settings.sqlite_profile
+
+    def apply(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {profile.synchronous}")
+            cursor.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+            cursor.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+            cursor.execute(f"PRAGMA temp_store = {profile.temp_store}")
+            if read_only:
+                cursor.execute("PRAGMA query_only = ON")
+        finally:
+            cursor.close()
+
+    return apply
+
+
+def _create_engine(read_only: bool = False) -> Engine:
+    created = create_engine(settings.database_url, echo=False, future=True)
+    if created.dialect.name == "sqlite":
+        event.listen(created, "connect", _sqlite_pragmas(read_only))
+    return created
+
+
+engine = _create_engine()
+# Reads get their own pool so ``query_only`` never leaks into write connections.
+# An in-memory database is private to its connection, so it has to share the engine.
+_separate_reads = engine.dialect.name == "sqlite" and engine.url.database not in (None, "", ":memory:")
+read_engine = _create_engine(read_only=True) if _separate_reads else engine
 SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+ReadSessionLocal = sessionmaker(bind=read_engine, expire_on_commit=False, class_=Session)
 
 
 @contextmanager
-def get_session() -> Session:
-    session = SessionLocal()
+def get_session(read_only: bool = False) -> Session:
+    """Open a session that commits on success; ``read_only`` sessions never write.
+
+    A read-only session is simply closed, which ends its transaction without
+    expiring the loaded objects (an explicit rollback would detach them empty).
+    """
+    session = (ReadSessionLocal if read_only else SessionLocal)()
     try:
         yield session
-        session.commit()
+        if not read_only:
+            session.commit()
     except Exception:
         session.rollback()
         raise
@@ -31,6 +73,20 @@ def get_session() -> Session:
 
 def init_db() -> None:
     from . import models  # noqa: F401
+    from .migrations import LATEST_VERSION, current_version, person_fts_missing, run_migrations
 
+    # Fast path: a database already at the latest schema version needs neither
+    # create_all's per-table reflection nor the migration runner.
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            if current_version(connection) >= LATEST_VERSION and not person_fts_missing(connection):
+                return
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
 
+def chunked(ids: Iterable[int], size: int = IN_CHUNK_SIZE) -> Iterator[list[int]]:
+    """Split ``ids`` into lists of at most ``size`` for ``IN (...)`` queries."""
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Connection, Engine
+
+
+@dataclass(slots=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...] = ()
+    run: Callable[[Connection], None] | None = None
+
+
+PERSON_FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS person_fts USING fts5("
+    "name, notes, content='person', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS person_fts_ai AFTER INSERT ON person BEGIN "
+    "INSERT INTO person_fts(rowid, name, notes) VALUES (new.id, new.name, new.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS person_fts_ad AFTER DELETE ON person BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS person_fts_au AFTER UPDATE ON person BEGIN "
+    "INSERT INTO person_fts(person_fts, rowid, name, notes) VALUES ('delete', old.id, old.name, old.notes); "
+    "INSERT INTO person_fts(rowid, name, notes) VALUES (new.id, new.name, new.notes); END",
+    "INSERT INTO person_fts(person_fts) VALUES ('rebuild')",
+)
+
+
+def _has_fts5(connection: Connection) -> bool:
+    options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def _create_person_fts(connection: Connection) -> None:
+    # Some SQLite builds ship without FTS5; search then falls back to LIKE.
+    if not _has_fts5(connection):
+        return
+    for statement in PERSON_FTS_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+
+def person_fts_missing(connection: Connection) -> bool:
+    """True when migration 2 was skipped for lack of FTS5 but this SQLite build has it."""
+    if current_version(connection) < 2 or not _has_fts5(connection):
+        return False
+    return not connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'person_fts'").scalar()
+
+
+# Versions are applied in order and recorded in SQLite's ``PRAGMA user_version``.
+# Fresh databases get the same objects from ``create_all``; every statement
+# therefore has to be idempotent (``IF NOT EXISTS``).
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "Index hot lookup columns",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_person_name ON person (name)",
+            "CREATE INDEX IF NOT EXISTS ix_marriage_husband_id ON marriage (husband_id)",
+            "CREATE INDEX IF NOT EXISTS ix_marriage_wife_id ON marriage (wife_id)",
+            "CREATE INDEX IF NOT EXISTS ix_children_child_id ON children (child_id)",
+        ),
+    ),
+    Migration(
+        2,
+        "Full-text index over person name and notes",
+        run=_create_person_fts,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    return int(connection.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+
+def run_migrations(engine: Engine) -> int:
+    """Upgrade the schema in place and return the resulting version."""
+    if engine.dialect.name != "sqlite":
+        return LATEST_VERSION
+    with engine.begin() as connection:
+        version = current_version(connection)
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            for statement in migration.statements:
+                connection.exec_driver_sql(statement)
+            if migration.run:
+                migration.run(connection)
+            # PRAGMA does not accept bound parameters; the value is a trusted int.
+            connection.exec_driver_sql(f"PRAGMA user_version = {int(migration.version)}")
+            version = migration.version
+        if person_fts_missing(connection):
+            _create_person_fts(connection)
+    return version
+
+
+def _hot_queries() -> dict:
+    # Built from the services' own query builders so the check follows the code.
+    from .services import marriages, people, relatives
+
+    ids = [1, 2, 3]
+    return {
+        "people.list_people (order by name)": people._query_people(),
+        "relatives.lookup (parent links)": relatives._parent_links(ids),
+        "relatives.lookup (spouse marriages)": relatives._spouse_marriages(ids),
+        "relatives.lookup (couples)": relatives._couples(ids),
+        "relatives.lookup (child links)": relatives._child_links(ids),
+        "relatives.lookup (names)": relatives._names(ids),
+        "marriages.list_children": marriages._query_children(1),
+        "marriages.list_child_ids": marriages._query_child_ids(),
+    }
+
+
+def _uses_index(plan: list[str]) -> bool:
+    scans = any(line.startswith("SCAN") for line in plan)
+    for line in plan:
+        if line.startswith("SCAN") and " USING " not in line:
+            return False
+        # Sorting rows found through an index SEARCH is bounded by the lookup;
+        # sorting after a SCAN means ordering the whole table.
+        if "TEMP B-TREE" in line and scans:
+            return False
+    return True
+
+
+def check_query_plans(engine: Engine) -> dict[str, tuple[bool, list[str]]]:
+    """Run ``EXPLAIN QUERY PLAN`` for the hot service queries.
+
+    Returns ``{query name: (uses_index, plan lines)}``; a plan fails when it
+    contains a bare table ``SCAN`` or sorts a scanned table in a temporary
+    B-tree.
+    """
+    report: dict[str, tuple[bool, list[str]]] = {}
+    with engine.connect() as connection:
+        for name, stmt in _hot_queries().items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            plan = [row[-1] for row in rows]
+            report[name] = (_uses_index(plan), plan)
+    return report
+
+
+def main() -> int:
+    from .database import engine, init_db
+
+    init_db()
+    failed = False
+    for name, (ok, plan) in check_query_plans(engine).items():
+        failed = failed or not ok
+        print(f"[{'OK' if ok else 'SCAN'}] {name}")
+        for line in plan:
+            print(f"    {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
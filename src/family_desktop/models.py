@@ -13,7 +13,7 @@ class Person(Base):
     __tablename__ = "person"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(120), nullable=False)
+    name: Mapped[str] = mapped_column(String(120), nullable=False, index=True)
     gender: Mapped[str] = mapped_column(String(10), nullable=False)
     birth_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     death_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
@@ -43,8 +43,8 @@ class Marriage(Base):
     __tablename__ = "marriage"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    husband_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False)
-    wife_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False)
+    husband_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False, index=True)
+    wife_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False, index=True)
     marriage_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
@@ -76,7 +76,7 @@ class ChildLink(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     marriage_id: Mapped[int] = mapped_column(ForeignKey("marriage.id"), nullable=False)
-    child_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False)
+    child_id: Mapped[int] = mapped_column(ForeignKey("person.id"), nullable=False, index=True)
 
     marriage: Mapped[Marriage] = relationship(back_populates="children")
     child: Mapped[Person] = relationship()
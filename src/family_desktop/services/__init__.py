@@ -1,4 +1,29 @@
-from . import kinship, marriages, people, reports, tree_builder, users
+"""Service layer.
+
+Submodules are imported on first attribute access, so ``from ..services import
+users`` does not drag reportlab, graphviz and PIL in before the login window.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import (
+        backup,
+        events,
+        family_graph,
+        gedcom,
+        instrumentation,
+        kinship,
+        marriages,
+        people,
+        relatives,
+        reports,
+        tree_builder,
+        users,
+    )
 
 __all__ = [
     "people",
@@ -7,5 +32,16 @@ __all__ = [
     "tree_builder",
     "users",
     "kinship",
+    "family_graph",
+    "gedcom",
+    "backup",
+    "relatives",
+    "instrumentation",
+    "events",
 ]
 
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
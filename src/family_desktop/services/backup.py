@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterator
+
+from sqlalchemy import Date, Integer, Table, delete, func, insert, select
+
+from ..config import settings
+from ..database import get_session
+from ..models import ChildLink, Marriage, Person, User
+from . import events, instrumentation
+
+ProgressCallback = Callable[[int, int], None]
+
+# Parents before children so foreign keys can be remapped in a single pass.
+BACKUP_TABLES: tuple[Table, ...] = (
+    Person.__table__,
+    Marriage.__table__,
+    ChildLink.__table__,
+    User.__table__,
+)
+MANIFEST = "manifest.json"
+
+
+@dataclass(slots=True)
+class BackupImportSummary:
+    imported: dict[str, int] = field(default_factory=dict)
+    skipped: dict[str, int] = field(default_factory=dict)
+
+
+def _encode(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _decoder(table: Table) -> Callable[[dict], dict]:
+    converters = {}
+    for column in table.columns:
+        if isinstance(column.type, Date):
+            converters[column.name] = date.fromisoformat
+        elif isinstance(column.type, Integer):
+            converters[column.name] = int
+        else:
+            converters[column.name] = str
+
+    def decode(row: dict) -> dict:
+        decoded = {}
+        for name, convert in converters.items():
+            raw = row.get(name, "")
+            if raw == "" and table.columns[name].nullable:
+                decoded[name] = None
+            else:
+                decoded[name] = convert(raw)
+        return decoded
+
+    return decode
+
+
+def export_backup(
+    filename: str | Path = "backup.zip",
+    compress: bool = True,
+    progress: ProgressCallback | None = None,
+    chunk_size: int = 5000,
+) -> str:
+    """Dump every table as CSV into one zip archive, streaming rows by primary key."""
+    path = settings.export_dir / filename
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    counts: dict[str, int] = {}
+    with get_session(read_only=True) as session, zipfile.ZipFile(path, "w", compression=compression) as archive:
+        total = sum(session.scalar(select(func.count()).select_from(table)) or 0 for table in BACKUP_TABLES)
+        done = 0
+        for table in BACKUP_TABLES:
+            columns = [column.name for column in table.columns]
+            counts[table.name] = 0
+            with archive.open(f"{table.name}.csv", "w") as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                rows = session.execute(
+                    select(table).order_by(*table.primary_key.columns),
+                    execution_options={"yield_per": chunk_size},
+                )
+                for row in rows:
+                    writer.writerow([_encode(value) for value in row])
+                    counts[table.name] += 1
+                    done += 1
+                    if progress and done % chunk_size == 0:
+                        progress(done, total)
+                text.flush()
+                text.detach()
+        archive.writestr(MANIFEST, json.dumps({"format": 1, "tables": counts}, indent=2))
+    if progress:
+        progress(total, total)
+    return str(path)
+
+
+def _read_table(archive: zipfile.ZipFile, table: Table) -> Iterator[dict]:
+    name = f"{table.name}.csv"
+    if name not in archive.namelist():
+        return
+    decode = _decoder(table)
+    with archive.open(name) as raw:
+        for row in csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline="")):
+            yield decode(row)
+
+
+def import_backup(
+    path: str | Path,
+    progress: ProgressCallback | None = None,
+    batch_size: int = 5000,
+    replace: bool = False,
+) -> BackupImportSummary:
+    """Load a backup made by ``export_backup`` into the current database.
+
+    With ``replace`` every table present in the archive is emptied first and
+    rows keep their original ids, so restoring into the same database gives
+    back exactly the backed-up data. Otherwise rows are appended with fresh
+    ids after the current maximum and person and marriage references are
+    remapped on the fly; child links whose parent rows are missing are
+    skipped, and so are users whose username already exists. Everything runs
+    in one transaction with ``executemany`` batches.
+    """
+    summary = BackupImportSummary()
+    with zipfile.ZipFile(path) as archive, get_session() as session:
+        manifest = json.loads(archive.read(MANIFEST)) if MANIFEST in archive.namelist() else {}
+        if replace:
+            # Children before parents, the reverse of the insert order.
+            for table in reversed(BACKUP_TABLES):
+                if f"{table.name}.csv" in archive.namelist():
+                    session.execute(delete(table))
+        total = sum(manifest.get("tables", {}).values())
+        done = 0
+        person_ids: dict[int, int] = {}
+        marriage_ids: dict[int, int] = {}
+        usernames = set(session.scalars(select(User.username)))
+        next_ids = {
+            table.name: (session.scalar(select(func.max(table.c.id))) or 0) + 1 for table in BACKUP_TABLES
+        }
+
+        def remap(table: Table, row: dict) -> dict | None:
+            if replace:
+                return row
+            if table is Person.__table__:
+                person_ids[row["id"]] = next_ids[table.name]
+            elif table is Marriage.__table__:
+                husband_id = person_ids.get(row["husband_id"])
+                wife_id = person_ids.get(row["wife_id"])
+                if not husband_id or not wife_id:
+                    return None
+                row.update(husband_id=husband_id, wife_id=wife_id)
+                marriage_ids[row["id"]] = next_ids[table.name]
+            elif table is ChildLink.__table__:
+                marriage_id = marriage_ids.get(row["marriage_id"])
+                child_id = person_ids.get(row["child_id"])
+                if not marriage_id or not child_id:
+                    return None
+                row.update(marriage_id=marriage_id, child_id=child_id)
+            elif table is User.__table__:
+                if row["username"] in usernames:
+                    return None
+                usernames.add(row["username"])
+            row["id"] = next_ids[table.name]
+            next_ids[table.name] += 1
+            return row
+
+        for table in BACKUP_TABLES:
+            batch: list[dict] = []
+            imported = skipped = 0
+            for row in _read_table(archive, table):
+                done += 1
+                mapped = remap(table, row)
+                if mapped is None:
+                    skipped += 1
+                    continue
+                batch.append(mapped)
+                imported += 1
+                if len(batch) >= batch_size:
+                    session.execute(insert(table), batch)
+                    batch.clear()
+                    if progress:
+                        progress(done, total)
+            if batch:
+                session.execute(insert(table), batch)
+            summary.imported[table.name] = imported
+            summary.skipped[table.name] = skipped
+    events.publish(events.DataReloaded("backup"))
+    if progress:
+        progress(total, total)
+    return summary
+
+
+instrumentation.instrument_module(__name__)
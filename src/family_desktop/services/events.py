@@ -0,0 +1,97 @@
+"""Typed change notifications published by the services after each committed write.
+
+Handlers run synchronously on the thread that made the change, in the order
+they subscribed. A failing handler is logged and skipped so it cannot turn a
+committed write into an error for the caller.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+from . import instrumentation
+
+if TYPE_CHECKING:
+    from .marriages import MarriageRow
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PersonSaved:
+    person: dict
+    created: bool
+
+
+@dataclass(frozen=True, slots=True)
+class PersonDeleted:
+    person_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class MarriageSaved:
+    marriage: MarriageRow
+    created: bool
+
+
+@dataclass(frozen=True, slots=True)
+class MarriageDeleted:
+    marriage_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class ChildLinked:
+    link_id: int
+    marriage_id: int
+    child: dict
+
+
+@dataclass(frozen=True, slots=True)
+class ChildUnlinked:
+    link_id: int
+    marriage_id: int
+    child_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class DataReloaded:
+    """Bulk writes (imports, restores, seeding) that subscribers should reload instead of replaying."""
+
+    source: str
+
+
+ChangeEvent = PersonSaved | PersonDeleted | MarriageSaved | MarriageDeleted | ChildLinked | ChildUnlinked | DataReloaded
+E = TypeVar("E", bound=ChangeEvent)
+
+_subscribers: dict[type, list[Callable]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(event_type: type[E], handler: Callable[[E], None]) -> Callable[[], None]:
+    """Call ``handler`` for every published ``event_type``; returns a function that unsubscribes."""
+    with _lock:
+        _subscribers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe() -> None:
+        with _lock:
+            handlers = _subscribers.get(event_type, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    return unsubscribe
+
+
+def publish(event: ChangeEvent) -> None:
+    with _lock:
+        handlers = list(_subscribers.get(type(event), ()))
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception:
+            _logger.exception("Handler %r failed for %s", handler, type(event).__name__)
+
+
+instrumentation.instrument_module(__name__)
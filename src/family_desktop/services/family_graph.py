@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import select
+
+from ..database import get_session
+from ..models import ChildLink, Marriage, Person
+from . import events, instrumentation
+
+
+class FamilyGraph:
+    """In-memory adjacency index of people, marriages and child links.
+
+    Edges carry a reference count because the same pair of people can be
+    connected through more than one record (e.g. two marriages between the
+    same couple), so removing one record must not drop the edge.
+    """
+
+    def __init__(self):
+        self.labels: dict[int, str] = {}
+        self.genders: dict[int, str] = {}
+        self.marriages: dict[int, tuple[int, int]] = {}
+        self.child_links: dict[int, tuple[int, int]] = {}
+        self.links_by_marriage: dict[int, set[int]] = {}
+        self.marriages_by_person: dict[int, set[int]] = {}
+        self.links_by_child: dict[int, set[int]] = {}
+        self._edges: dict[int, Counter[int]] = {}
+
+    # region Queries
+    def __contains__(self, person_id: int) -> bool:
+        return person_id in self.labels
+
+    def neighbors(self, person_id: int):
+        return self._edges.get(person_id, {}).keys()
+
+    def children_of(self, marriage_id: int) -> list[int]:
+        return [self.child_links[link_id][1] for link_id in self.links_by_marriage.get(marriage_id, ())]
+
+    def parent_marriages(self, person_id: int) -> list[int]:
+        return [self.child_links[link_id][0] for link_id in self.links_by_child.get(person_id, ())]
+
+    def spouse_marriages(self, person_id: int) -> set[int]:
+        return self.marriages_by_person.get(person_id, set())
+
+    # endregion
+    # region Edge bookkeeping
+    def _link(self, a: int, b: int) -> None:
+        if not a or not b or a not in self.labels or b not in self.labels:
+            return
+        self._edges[a][b] += 1
+        self._edges[b][a] += 1
+
+    def _unlink(self, a: int, b: int) -> None:
+        for left, right in ((a, b), (b, a)):
+            counter = self._edges.get(left)
+            if counter is None or right not in counter:
+                continue
+            counter[right] -= 1
+            if counter[right] <= 0:
+                del counter[right]
+
+    def _child_edges(self, marriage_id: int, child_id: int) -> list[tuple[int, int]]:
+        parents = self.marriages.get(marriage_id)
+        if not parents:
+            return []
+        return [(parent_id, child_id) for parent_id in parents if parent_id]
+
+    # endregion
+    # region Mutations
+    def put_person(self, person_id: int, name: str, gender: str | None = None) -> None:
+        self.labels[person_id] = name
+        self.genders[person_id] = gender or "unknown"
+        self._edges.setdefault(person_id, Counter())
+
+    def remove_person(self, person_id: int) -> None:
+        self.labels.pop(person_id, None)
+        self.genders.pop(person_id, None)
+        for neighbor in self._edges.pop(person_id, {}):
+            self._edges.get(neighbor, Counter()).pop(person_id, None)
+
+    def put_marriage(self, marriage_id: int, husband_id: int, wife_id: int) -> None:
+        links = self.links_by_marriage.get(marriage_id, set())
+        if marriage_id in self.marriages:
+            self._drop_marriage_edges(marriage_id, links)
+        self.marriages[marriage_id] = (husband_id, wife_id)
+        for spouse_id in (husband_id, wife_id):
+            if spouse_id:
+                self.marriages_by_person.setdefault(spouse_id, set()).add(marriage_id)
+        self.links_by_marriage.setdefault(marriage_id, set())
+        self._link(husband_id, wife_id)
+        for link_id in links:
+            _, child_id = self.child_links[link_id]
+            for parent_id, child in self._child_edges(marriage_id, child_id):
+                self._link(parent_id, child)
+
+    def remove_marriage(self, marriage_id: int) -> None:
+        if marriage_id not in self.marriages:
+            return
+        links = self.links_by_marriage.pop(marriage_id, set())
+        self._drop_marriage_edges(marriage_id, links)
+        for link_id in links:
+            _, child_id = self.child_links.pop(link_id)
+            self.links_by_child.get(child_id, set()).discard(link_id)
+        del self.marriages[marriage_id]
+
+    def _drop_marriage_edges(self, marriage_id: int, links: set[int]) -> None:
+        husband_id, wife_id = self.marriages[marriage_id]
+        for spouse_id in (husband_id, wife_id):
+            self.marriages_by_person.get(spouse_id, set()).discard(marriage_id)
+        self._unlink(husband_id, wife_id)
+        for link_id in links:
+            _, child_id = self.child_links[link_id]
+            for parent_id, child in self._child_edges(marriage_id, child_id):
+                self._unlink(parent_id, child)
+
+    def put_child_link(self, link_id: int, marriage_id: int, child_id: int) -> None:
+        if link_id in self.child_links:
+            self.remove_child_link(link_id)
+        self.child_links[link_id] = (marriage_id, child_id)
+        self.links_by_marriage.setdefault(marriage_id, set()).add(link_id)
+        self.links_by_child.setdefault(child_id, set()).add(link_id)
+        for parent_id, child in self._child_edges(marriage_id, child_id):
+            self._link(parent_id, child)
+
+    def remove_child_link(self, link_id: int) -> None:
+        record = self.child_links.pop(link_id, None)
+        if not record:
+            return
+        marriage_id, child_id = record
+        self.links_by_marriage.get(marriage_id, set()).discard(link_id)
+        self.links_by_child.get(child_id, set()).discard(link_id)
+        for parent_id, child in self._child_edges(marriage_id, child_id):
+            self._unlink(parent_id, child)
+
+    # endregion
+
+    @classmethod
+    def load(cls) -> "FamilyGraph":
+        graph = cls()
+        with get_session(read_only=True) as session:
+            for person_id, name, gender in session.execute(
+                select(Person.id, Person.name, Person.gender)
+            ):
+                graph.put_person(person_id, name, gender)
+            for marriage_id, husband_id, wife_id in session.execute(
+                select(Marriage.id, Marriage.husband_id, Marriage.wife_id)
+            ):
+                graph.put_marriage(marriage_id, husband_id, wife_id)
+            for link_id, marriage_id, child_id in session.execute(
+                select(ChildLink.id, ChildLink.marriage_id, ChildLink.child_id)
+            ):
+                graph.put_child_link(link_id, marriage_id, child_id)
+        return graph
+
+
+_graph: FamilyGraph | None = None
+_lock = threading.RLock()
+
+
+def get_graph() -> FamilyGraph:
+    """Return the process-wide graph, loading it from the database on first use."""
+    global _graph
+    with _lock:
+        if _graph is None:
+            _graph = FamilyGraph.load()
+        return _graph
+
+
+@contextmanager
+def locked_graph():
+    """Hold the graph lock for a whole traversal so writers cannot mutate it mid-walk."""
+    with _lock:
+        yield get_graph()
+
+
+def invalidate() -> None:
+    """Drop the cached graph so the next lookup reloads it (e.g. after bulk writes)."""
+    global _graph
+    with _lock:
+        _graph = None
+
+
+def _apply(method: str, *args) -> None:
+    # Writes before the first lookup are no-ops: the initial load reads them anyway.
+    with _lock:
+        if _graph is not None:
+            getattr(_graph, method)(*args)
+
+
+def _on_person_saved(event: events.PersonSaved) -> None:
+    person = event.person
+    _apply("put_person", person["id"], person["name"], person.get("gender"))
+
+
+def _on_marriage_saved(event: events.MarriageSaved) -> None:
+    marriage = event.marriage
+    _apply("put_marriage", marriage.id, marriage.husband_id, marriage.wife_id)
+
+
+events.subscribe(events.PersonSaved, _on_person_saved)
+events.subscribe(events.PersonDeleted, lambda event: _apply("remove_person", event.person_id))
+events.subscribe(events.MarriageSaved, _on_marriage_saved)
+events.subscribe(events.MarriageDeleted, lambda event: _apply("remove_marriage", event.marriage_id))
+events.subscribe(
+    events.ChildLinked, lambda event: _apply("put_child_link", event.link_id, event.marriage_id, event.child["id"])
+)
+events.subscribe(events.ChildUnlinked, lambda event: _apply("remove_child_link", event.link_id))
+events.subscribe(events.DataReloaded, lambda event: invalidate())
+
+
+instrumentation.instrument_module(__name__, exclude=("locked_graph",))
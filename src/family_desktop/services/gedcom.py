@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import gzip
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TextIO
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import aliased
+
+from ..config import settings
+from ..database import get_session
+from ..models import ChildLink, Marriage, Person
+from . import events, instrumentation
+
+ProgressCallback = Callable[[int, int], None]
+
+_LINE = re.compile(r"^\s*(\d+)\s+(?:(@[^@]+@)\s+)?(\S+)(?: (.*))?$")
+_DATE = re.compile(r"^(\d{1,2}) ([A-Z]{3}) (\d{3,4})$")
+_MONTHS = {
+    name: index
+    for index, name in enumerate(
+        ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), start=1
+    )
+}
+_GENDERS = {"M": "male", "F": "female"}
+_SEX_CODES = {"male": "M", "female": "F"}
+_MONTH_NAMES = {index: name for name, index in _MONTHS.items()}
+# GEDCOM caps a line at 255 characters; long note lines continue with CONC.
+_MAX_VALUE = 200
+
+
+@dataclass(slots=True)
+class GedcomImportSummary:
+    people: int = 0
+    marriages: int = 0
+    children: int = 0
+    skipped_families: int = 0
+
+
+@dataclass(slots=True)
+class _Record:
+    tag: str
+    xref: str | None
+    name: str | None = None
+    sex: str | None = None
+    birth: date | None = None
+    death: date | None = None
+    marriage_date: date | None = None
+    notes: list[str] = field(default_factory=list)
+    husband: str | None = None
+    wife: str | None = None
+    children: list[str] = field(default_factory=list)
+
+
+def parse_gedcom_date(value: str | None) -> date | None:
+    """Parse exact ``D MON YYYY`` dates; approximate or partial dates are dropped."""
+    match = _DATE.match((value or "").strip().upper())
+    if not match:
+        return None
+    day, month, year = match.groups()
+    try:
+        return date(int(year), _MONTHS[month], int(day))
+    except (KeyError, ValueError):
+        return None
+
+
+def _clean_name(value: str) -> str:
+    return " ".join(value.replace("/", " ").split())
+
+
+def _iter_records(path: Path, progress: ProgressCallback | None) -> Iterator[_Record]:
+    """Stream level-0 INDI/FAM records from the file, one line at a time."""
+    total = path.stat().st_size
+    read = reported = 0
+    step = max(total // 200, 1)
+    record: _Record | None = None
+    event: str | None = None
+    with path.open("rb") as fh:
+        for index, raw in enumerate(fh):
+            read += len(raw)
+            line = raw.decode("utf-8-sig" if index == 0 else "utf-8", errors="replace").rstrip("\r\n")
+            match = _LINE.match(line)
+            if not match:
+                continue
+            level, xref, tag, value = int(match[1]), match[2], match[3].upper(), match[4] or ""
+            if level == 0:
+                if record:
+                    yield record
+                    if progress and read - reported >= step:
+                        reported = read
+                        progress(read, total)
+                record = _Record(tag, xref) if tag in ("INDI", "FAM") else None
+                event = None
+                continue
+            if record is None:
+                continue
+            if level == 1:
+                event = tag
+                if tag == "NAME" and record.name is None:
+                    record.name = _clean_name(value)
+                elif tag == "SEX":
+                    record.sex = value.strip().upper()[:1]
+                elif tag == "HUSB":
+                    record.husband = value.strip()
+                elif tag == "WIFE":
+                    record.wife = value.strip()
+                elif tag == "CHIL":
+                    record.children.append(value.strip())
+                elif tag == "NOTE" and not value.startswith("@"):
+                    record.notes.append(value)
+            elif level == 2:
+                if tag == "DATE":
+                    parsed = parse_gedcom_date(value)
+                    if event == "BIRT":
+                        record.birth = parsed
+                    elif event == "DEAT":
+                        record.death = parsed
+                    elif event == "MARR":
+                        record.marriage_date = parsed
+                elif event == "NOTE" and record.notes:
+                    if tag == "CONT":
+                        record.notes[-1] += "\n" + value
+                    elif tag == "CONC":
+                        record.notes[-1] += value
+    if record:
+        yield record
+    if progress:
+        progress(total, total)
+
+
+def import_gedcom(
+    path: str | Path,
+    progress: ProgressCallback | None = None,
+    batch_size: int = 5000,
+) -> GedcomImportSummary:
+    """Import INDI/FAM/CHIL records from a GEDCOM 5.5.1 file (UTF-8).
+
+    The file is streamed line by line and rows go in with ``executemany``
+    batches inside a single transaction. Ids are assigned up front so
+    families may reference individuals that appear later in the file;
+    families without both spouses are skipped because ``marriage`` requires
+    a husband and a wife.
+    """
+    path = Path(path)
+    summary = GedcomImportSummary()
+    with get_session() as session:
+        next_person_id = (session.scalar(select(func.max(Person.id))) or 0) + 1
+        next_marriage_id = (session.scalar(select(func.max(Marriage.id))) or 0) + 1
+        person_ids: dict[str, int] = {}
+        families: list[_Record] = []
+        batch: list[dict] = []
+
+        def flush(table, rows: list[dict]) -> None:
+            if rows:
+                session.execute(insert(table), rows)
+                rows.clear()
+
+        for record in _iter_records(path, progress):
+            if record.tag == "FAM":
+                families.append(record)
+                continue
+            if not record.xref or record.xref in person_ids:
+                continue
+            person_ids[record.xref] = next_person_id
+            batch.append(
+                {
+                    "id": next_person_id,
+                    "name": record.name or "Unknown",
+                    "gender": _GENDERS.get(record.sex or "", "unknown"),
+                    "birth_date": record.birth,
+                    "death_date": record.death,
+                    "notes": "\n".join(record.notes) or None,
+                }
+            )
+            next_person_id += 1
+            summary.people += 1
+            if len(batch) >= batch_size:
+                flush(Person.__table__, batch)
+        flush(Person.__table__, batch)
+
+        link_batch: list[dict] = []
+        for family in families:
+            husband_id = person_ids.get(family.husband or "")
+            wife_id = person_ids.get(family.wife or "")
+            if not husband_id or not wife_id:
+                summary.skipped_families += 1
+                continue
+            batch.append(
+                {
+                    "id": next_marriage_id,
+                    "husband_id": husband_id,
+                    "wife_id": wife_id,
+                    "marriage_date": family.marriage_date,
+                    "notes": "\n".join(family.notes) or None,
+                }
+            )
+            for child_id in dict.fromkeys(person_ids.get(xref) for xref in family.children):
+                if child_id:
+                    link_batch.append({"marriage_id": next_marriage_id, "child_id": child_id})
+                    summary.children += 1
+            next_marriage_id += 1
+            summary.marriages += 1
+            if len(batch) >= batch_size:
+                flush(Marriage.__table__, batch)
+            if len(link_batch) >= batch_size:
+                flush(Marriage.__table__, batch)
+                flush(ChildLink.__table__, link_batch)
+        flush(Marriage.__table__, batch)
+        flush(ChildLink.__table__, link_batch)
+    events.publish(events.DataReloaded("gedcom"))
+    return summary
+
+
+class _Grouped:
+    """Merge-join helper over ``(key, value)`` rows sorted by key."""
+
+    def __init__(self, rows: Iterable):
+        self._groups = groupby(rows, key=itemgetter(0))
+        self._current = next(self._groups, None)
+
+    def take(self, key: int) -> list:
+        while self._current is not None and self._current[0] < key:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != key:
+            return []
+        values = [row[1] for row in self._current[1]]
+        self._current = next(self._groups, None)
+        return values
+
+
+def format_gedcom_date(value: date | None) -> str | None:
+    if not value:
+        return None
+    return f"{value.day} {_MONTH_NAMES[value.month]} {value.year}"
+
+
+def _write_note(out: TextIO, level: int, text: str | None) -> None:
+    if not text:
+        return
+    for index, line in enumerate(text.splitlines() or [""]):
+        line_level, tag = (level, "NOTE") if index == 0 else (level + 1, "CONT")
+        chunks = [line[i : i + _MAX_VALUE] for i in range(0, len(line), _MAX_VALUE)] or [""]
+        out.write(f"{line_level} {tag} {chunks[0]}".rstrip() + "\n")
+        for chunk in chunks[1:]:
+            out.write(f"{level + 1} CONC {chunk}\n")
+
+
+def _write_event(out: TextIO, tag: str, value: date | None) -> None:
+    formatted = format_gedcom_date(value)
+    if formatted:
+        out.write(f"1 {tag}\n2 DATE {formatted}\n")
+
+
+def export_gedcom(
+    filename: str | Path = "family.ged",
+    compress: bool = False,
+    progress: ProgressCallback | None = None,
+    chunk_size: int = 2000,
+) -> str:
+    """Write people, marriages and child links as GEDCOM 5.5.1.
+
+    Every table is read with streamed, id-ordered cursors and merge-joined in
+    Python, so memory use does not depend on the size of the tree. With
+    ``compress`` the output is gzip-compressed (``.ged.gz``).
+    """
+    path = settings.export_dir / filename
+    if compress and path.suffix != ".gz":
+        path = path.with_name(path.name + ".gz")
+    opener = gzip.open if compress else open
+    stream = {"yield_per": chunk_size}
+    husband = aliased(Person)
+    wife = aliased(Person)
+
+    with get_session(read_only=True) as session, opener(path, "wt", encoding="utf-8", newline="\n") as out:
+        total = (session.scalar(select(func.count(Person.id))) or 0) + (
+            session.scalar(select(func.count(Marriage.id))) or 0
+        )
+        done = 0
+        out.write(
+            "0 HEAD\n1 SOUR FAMILY_DESKTOP\n2 NAME Family Tree Desktop\n1 SUBM @SUBM1@\n"
+            "1 GEDC\n2 VERS 5.5.1\n2 FORM LINEAGE-LINKED\n1 CHAR UTF-8\n"
+            "0 @SUBM1@ SUBM\n1 NAME Family Tree Desktop\n"
+        )
+
+        spouse_of = _Grouped(
+            session.execute(
+                select(Marriage.husband_id.label("person_id"), Marriage.id)
+                .union_all(select(Marriage.wife_id, Marriage.id))
+                .order_by("person_id", "id"),
+                execution_options=stream,
+            )
+        )
+        child_of = _Grouped(
+            session.execute(
+                select(ChildLink.child_id, ChildLink.marriage_id).order_by(
+                    ChildLink.child_id, ChildLink.marriage_id
+                ),
+                execution_options=stream,
+            )
+        )
+        people = session.execute(
+            select(Person.id, Person.name, Person.gender, Person.birth_date, Person.death_date, Person.notes)
+            .order_by(Person.id),
+            execution_options=stream,
+        )
+        for person in people:
+            out.write(f"0 @I{person.id}@ INDI\n1 NAME {person.name}\n")
+            sex = _SEX_CODES.get((person.gender or "").lower())
+            if sex:
+                out.write(f"1 SEX {sex}\n")
+            _write_event(out, "BIRT", person.birth_date)
+            _write_event(out, "DEAT", person.death_date)
+            for marriage_id in child_of.take(person.id):
+                out.write(f"1 FAMC @F{marriage_id}@\n")
+            for marriage_id in spouse_of.take(person.id):
+                out.write(f"1 FAMS @F{marriage_id}@\n")
+            _write_note(out, 1, person.notes)
+            done += 1
+            if progress and done % chunk_size == 0:
+                progress(done, total)
+
+        children_of = _Grouped(
+            session.execute(
+                select(ChildLink.marriage_id, ChildLink.child_id)
+                .join(Person, Person.id == ChildLink.child_id)
+                .order_by(ChildLink.marriage_id, ChildLink.id),
+                execution_options=stream,
+            )
+        )
+        families = session.execute(
+            select(
+                Marriage.id,
+                husband.id.label("husband_id"),
+                wife.id.label("wife_id"),
+                Marriage.marriage_date,
+                Marriage.notes,
+            )
+            .outerjoin(husband, husband.id == Marriage.husband_id)
+            .outerjoin(wife, wife.id == Marriage.wife_id)
+            .order_by(Marriage.id),
+            execution_options=stream,
+        )
+        for family in families:
+            out.write(f"0 @F{family.id}@ FAM\n")
+            if family.husband_id:
+                out.write(f"1 HUSB @I{family.husband_id}@\n")
+            if family.wife_id:
+                out.write(f"1 WIFE @I{family.wife_id}@\n")
+            _write_event(out, "MARR", family.marriage_date)
+            for child_id in children_of.take(family.id):
+                out.write(f"1 CHIL @I{child_id}@\n")
+            _write_note(out, 1, family.notes)
+            done += 1
+            if progress and done % chunk_size == 0:
+                progress(done, total)
+        out.write("0 TRLR\n")
+    if progress:
+        progress(total, total)
+    return str(path)
+
+
+instrumentation.instrument_module(__name__)
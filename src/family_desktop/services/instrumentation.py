@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+# Percentiles are computed over the most recent calls only.
+WINDOW = 500
+
+_logger = logging.getLogger("family_desktop.metrics")
+_logger.propagate = False
+_local = threading.local()
+_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class _Calls:
+    durations: deque[float] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    statements: deque[int] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    # Only calls that returned a list or tuple; other results have no row count.
+    rows: deque[int] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    count: int = 0
+    errors: int = 0
+
+
+@dataclass(slots=True)
+class CallStats:
+    name: str
+    calls: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    avg_statements: float
+    max_statements: int
+    avg_rows: float | None
+
+
+_calls: dict[str, _Calls] = {}
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def snapshot() -> list[CallStats]:
+    """Rolling statistics per instrumented function, slowest p95 first."""
+    with _lock:
+        items = [
+            (name, calls, list(calls.durations), list(calls.statements), list(calls.rows))
+            for name, calls in _calls.items()
+        ]
+    stats = []
+    for name, calls, durations, statements, rows in items:
+        ordered = sorted(durations)
+        stats.append(
+            CallStats(
+                name=name,
+                calls=calls.count,
+                errors=calls.errors,
+                p50_ms=_percentile(ordered, 0.50) * 1000,
+                p95_ms=_percentile(ordered, 0.95) * 1000,
+                p99_ms=_percentile(ordered, 0.99) * 1000,
+                max_ms=(ordered[-1] if ordered else 0.0) * 1000,
+                avg_statements=sum(statements) / len(statements) if statements else 0.0,
+                max_statements=max(statements, default=0),
+                avg_rows=sum(rows) / len(rows) if rows else None,
+            )
+        )
+    stats.sort(key=lambda item: item.p95_ms, reverse=True)
+    return stats
+
+
+def reset() -> None:
+    with _lock:
+        _calls.clear()
+
+
+def _log(record: dict) -> None:
+    if not settings.metrics_log:
+        return
+    if not _logger.handlers:
+        with _lock:
+            if not _logger.handlers:
+                settings.metrics_log.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    settings.metrics_log, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                _logger.addHandler(handler)
+                _logger.setLevel(logging.INFO)
+    _logger.info(json.dumps(record, default=str))
+
+
+def _stack() -> list[list[int]]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Every enclosing instrumented call sees the statement, so counts are inclusive.
+    for counter in _stack():
+        counter[0] += 1
+
+
+def _rows_of(result) -> int | None:
+    # Paths, dicts and dataclasses have a length or none at all, but no rows.
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return None
+
+
+def _record(name: str, elapsed: float, statements: int, rows: int | None, failed: bool) -> None:
+    with _lock:
+        calls = _calls.get(name)
+        if calls is None:
+            calls = _calls[name] = _Calls()
+        calls.count += 1
+        calls.errors += failed
+        calls.durations.append(elapsed)
+        calls.statements.append(statements)
+        if rows is not None:
+            calls.rows.append(rows)
+    _log(
+        {
+            "ts": round(time.time(), 3),
+            "function": name,
+            "ms": round(elapsed * 1000, 3),
+            "sql": statements,
+            "rows": rows,
+            "error": failed,
+            "thread": threading.current_thread().name,
+        }
+    )
+
+
+def instrument(func, name: str | None = None):
+    """Wrap ``func`` to record wall time, SQL statements issued and rows returned."""
+    name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        counter = [0]
+        stack = _stack()
+        stack.append(counter)
+        started = time.perf_counter()
+        failed = True
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            _record(name, elapsed, counter[0], _rows_of(result), failed)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_module(module_name: str, exclude: tuple[str, ...] = ()) -> None:
+    """Replace the public functions defined in the module with instrumented wrappers.
+
+    Called as ``instrument_module(__name__)`` at the bottom of each service
+    module, so callers that import functions by name get the wrapped versions.
+    """
+    if not settings.instrumentation:
+        return
+    module = sys.modules[module_name]
+    for attr, value in list(vars(module).items()):
+        if (
+            attr.startswith("_")
+            or attr in exclude
+            or not inspect.isfunction(value)
+            or value.__module__ != module.__name__
+            or inspect.isgeneratorfunction(value)
+            or getattr(value, "__instrumented__", False)
+        ):
+            continue
+        setattr(module, attr, instrument(value))
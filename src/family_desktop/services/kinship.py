@@ -4,10 +4,13 @@ from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
-from sqlalchemy import select
+from . import instrumentation
+from .family_graph import FamilyGraph, locked_graph
 
-from ..database import get_session
-from ..models import ChildLink, Marriage, Person
+# Radius of the one-to-all sweep in ``find_relatives``. ``find_relationship``
+# searches without a limit by default, like the original BFS: the bidirectional
+# search stops once the smaller side runs out, so unrelated pairs stay cheap.
+DEFAULT_MAX_DEPTH = 12
 
 
 @dataclass(slots=True)
@@ -17,48 +20,137 @@ class RelationshipResult:
     is_mahram: bool
 
 
-def _build_graph():
-    adjacency: dict[int, set[int]] = {}
-    labels: dict[int, str] = {}
-    with get_session() as session:
-        people = session.scalars(select(Person)).all()
-        marriages = session.scalars(select(Marriage)).all()
-        children = session.scalars(select(ChildLink)).all()
-    marriage_map = {marriage.id: marriage for marriage in marriages}
-    for person in people:
-        adjacency[person.id] = set()
-        labels[person.id] = person.name
-    for marriage in marriages:
-        if marriage.husband_id and marriage.wife_id:
-            adjacency[marriage.husband_id].add(marriage.wife_id)
-            adjacency[marriage.wife_id].add(marriage.husband_id)
-    for child in children:
-        marriage = marriage_map.get(child.marriage_id)
-        parents = []
-        if marriage:
-            parents = [marriage.husband_id, marriage.wife_id]
-        for parent_id in parents:
-            if parent_id:
-                adjacency[parent_id].add(child.child_id)
-                adjacency[child.child_id].add(parent_id)
-    return adjacency, labels
-
-
-def find_relationship(source_id: int, target_id: int) -> Optional[RelationshipResult]:
-    adjacency, labels = _build_graph()
-    if source_id not in adjacency or target_id not in adjacency:
-        return None
-    visited = {source_id}
-    queue = deque([(source_id, [source_id])])
-    while queue:
-        node, path = queue.popleft()
-        if node == target_id:
-            relation_labels = [labels[node_id] for node_id in path]
-            distance = len(path) - 1
-            is_mahram = distance <= 3
-            return RelationshipResult(relation_labels, distance, is_mahram)
-        for neighbor in adjacency.get(node, []):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append((neighbor, path + [neighbor]))
+@dataclass(slots=True)
+class RelativeResult:
+    person_id: int
+    name: str
+    # Previous person on a shortest path; see ``relative_path``.
+    via: int
+    distance: int
+    is_mahram: bool
+
+
+def _is_mahram(distance: int) -> bool:
+    return distance <= 3
+
+
+def _walk_back(predecessors: dict[int, int | None], node: int) -> list[int]:
+    chain = []
+    current: int | None = node
+    while current is not None:
+        chain.append(current)
+        current = predecessors[current]
+    return chain
+
+
+def _expand_level(
+    graph: FamilyGraph,
+    frontier: list[int],
+    predecessors: dict[int, int | None],
+    depth: dict[int, int],
+    other_depth: dict[int, int],
+) -> tuple[list[int], tuple[int, int] | None]:
+    """Expand one full BFS level and return the next frontier plus the best meeting edge."""
+    next_frontier: list[int] = []
+    best: tuple[int, int] | None = None
+    best_distance: int | None = None
+    for node in frontier:
+        for neighbor in graph.neighbors(node):
+            if neighbor in other_depth:
+                distance = depth[node] + 1 + other_depth[neighbor]
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = (node, neighbor), distance
+            if neighbor not in predecessors:
+                predecessors[neighbor] = node
+                depth[neighbor] = depth[node] + 1
+                next_frontier.append(neighbor)
+    return next_frontier, best
+
+
+def _bidirectional_search(
+    graph: FamilyGraph, source_id: int, target_id: int, max_depth: int | None
+) -> list[int] | None:
+    if source_id == target_id:
+        return [source_id]
+    forward_pred: dict[int, int | None] = {source_id: None}
+    backward_pred: dict[int, int | None] = {target_id: None}
+    forward_depth = {source_id: 0}
+    backward_depth = {target_id: 0}
+    forward, backward = [source_id], [target_id]
+    forward_level = backward_level = 0
+    while forward and backward:
+        if max_depth is not None and forward_level + backward_level >= max_depth:
+            return None
+        # Always grow the smaller frontier; that is where the saving over one-sided BFS comes from.
+        if len(forward) <= len(backward):
+            forward, meeting = _expand_level(graph, forward, forward_pred, forward_depth, backward_depth)
+            forward_level += 1
+            if meeting:
+                near, far = meeting
+                return _walk_back(forward_pred, near)[::-1] + _walk_back(backward_pred, far)
+        else:
+            backward, meeting = _expand_level(graph, backward, backward_pred, backward_depth, forward_depth)
+            backward_level += 1
+            if meeting:
+                near, far = meeting
+                return _walk_back(forward_pred, far)[::-1] + _walk_back(backward_pred, near)
     return None
+
+
+def find_relationship(
+    source_id: int, target_id: int, max_depth: int | None = None
+) -> Optional[RelationshipResult]:
+    with locked_graph() as graph:
+        if source_id not in graph or target_id not in graph:
+            return None
+        path = _bidirectional_search(graph, source_id, target_id, max_depth)
+        if path is None:
+            return None
+        relation_labels = [graph.labels[node_id] for node_id in path]
+    distance = len(path) - 1
+    return RelationshipResult(relation_labels, distance, _is_mahram(distance))
+
+
+def find_relatives(person_id: int, max_depth: int | None = DEFAULT_MAX_DEPTH) -> list[RelativeResult]:
+    """Run a single BFS from ``person_id`` and report every relative it reaches."""
+    with locked_graph() as graph:
+        if person_id not in graph:
+            return []
+        labels = graph.labels
+        predecessors: dict[int, int | None] = {person_id: None}
+        depth = {person_id: 0}
+        order: list[int] = []
+        queue = deque([person_id])
+        while queue:
+            node = queue.popleft()
+            if max_depth is not None and depth[node] >= max_depth:
+                continue
+            for neighbor in graph.neighbors(node):
+                if neighbor not in predecessors:
+                    predecessors[neighbor] = node
+                    depth[neighbor] = depth[node] + 1
+                    order.append(neighbor)
+                    queue.append(neighbor)
+        results = [
+            RelativeResult(node, labels[node], predecessors[node], depth[node], _is_mahram(depth[node]))
+            for node in order
+        ]
+    results.sort(key=lambda item: (item.distance, item.name.lower()))
+    return results
+
+
+def relative_path(relatives: dict[int, RelativeResult], person_id: int) -> list[int]:
+    """Person ids from the searched person to ``person_id``, following ``via`` links.
+
+    Paths are rebuilt on demand so a search holds one id per relative instead
+    of one list per relative.
+    """
+    chain = [person_id]
+    row = relatives.get(person_id)
+    while row is not None:
+        chain.append(row.via)
+        row = relatives.get(row.via)
+    return chain[::-1]
+
+
+instrumentation.instrument_module(__name__, exclude=("relative_path",))
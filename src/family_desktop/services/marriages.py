@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, or_, select
+from sqlalchemy.orm import aliased, selectinload
 
 from ..database import get_session
 from ..models import ChildLink, Marriage, Person
+from . import events, instrumentation
 
 
 def _parse_date(value: str | None):
@@ -20,12 +22,97 @@ def _parse_date(value: str | None):
         return None
 
 
+@dataclass(slots=True)
+class MarriageRow:
+    """Flat listing row; avoids hydrating Marriage/Person objects for table views."""
+
+    id: int
+    husband_id: int | None
+    husband_name: str | None
+    wife_id: int | None
+    wife_name: str | None
+    marriage_date: str | None
+    notes: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.id} - {self.husband_name or '?'} & {self.wife_name or '?'}"
+
+    @classmethod
+    def from_marriage(cls, marriage: Marriage) -> "MarriageRow":
+        return cls(
+            id=marriage.id,
+            husband_id=marriage.husband_id,
+            husband_name=marriage.husband.name if marriage.husband else None,
+            wife_id=marriage.wife_id,
+            wife_name=marriage.wife.name if marriage.wife else None,
+            marriage_date=marriage.marriage_date.isoformat() if marriage.marriage_date else None,
+            notes=marriage.notes or "",
+        )
+
+
 def list_marriages() -> list[dict]:
-    with get_session() as session:
-        marriages = session.scalars(select(Marriage)).all()
+    with get_session(read_only=True) as session:
+        stmt = select(Marriage).options(selectinload(Marriage.husband), selectinload(Marriage.wife))
+        marriages = session.scalars(stmt).all()
         return [marriage.to_dict() for marriage in marriages]
 
 
+def list_marriage_rows(
+    limit: int | None = None,
+    after_id: int | None = None,
+    search: str | None = None,
+    before_id: int | None = None,
+) -> list[MarriageRow]:
+    """Return marriages with spouse names from one joined query.
+
+    Pages use a keyset cursor on ``Marriage.id``: pass the last id of the
+    previous page as ``after_id``, or the first id of the next page as
+    ``before_id`` to page backwards. Rows are always in ascending id order.
+    """
+    husband = aliased(Person)
+    wife = aliased(Person)
+    stmt = (
+        select(
+            Marriage.id,
+            Marriage.husband_id,
+            husband.name.label("husband_name"),
+            Marriage.wife_id,
+            wife.name.label("wife_name"),
+            Marriage.marriage_date,
+            Marriage.notes,
+        )
+        .outerjoin(husband, husband.id == Marriage.husband_id)
+        .outerjoin(wife, wife.id == Marriage.wife_id)
+        .order_by(Marriage.id.desc() if before_id is not None else Marriage.id)
+    )
+    if after_id is not None:
+        stmt = stmt.where(Marriage.id > after_id)
+    if before_id is not None:
+        stmt = stmt.where(Marriage.id < before_id)
+    if search:
+        pattern = f"%{search.lower()}%"
+        stmt = stmt.where(or_(husband.name.ilike(pattern), wife.name.ilike(pattern)))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    with get_session(read_only=True) as session:
+        rows = session.execute(stmt).all()
+    if before_id is not None:
+        rows.reverse()
+    return [
+        MarriageRow(
+            id=row.id,
+            husband_id=row.husband_id,
+            husband_name=row.husband_name,
+            wife_id=row.wife_id,
+            wife_name=row.wife_name,
+            marriage_date=row.marriage_date.isoformat() if row.marriage_date else None,
+            notes=row.notes or "",
+        )
+        for row in rows
+    ]
+
+
 def create_marriage(payload: dict) -> dict:
     with get_session() as session:
         marriage = Marriage(
@@ -36,7 +123,10 @@ def create_marriage(payload: dict) -> dict:
         )
         session.add(marriage)
         session.flush()
-        return marriage.to_dict()
+        result = marriage.to_dict()
+        row = MarriageRow.from_marriage(marriage)
+    events.publish(events.MarriageSaved(row, created=True))
+    return result
 
 
 def update_marriage(marriage_id: int, payload: dict) -> dict:
@@ -51,15 +141,20 @@ def update_marriage(marriage_id: int, payload: dict) -> dict:
             marriage.marriage_date = _parse_date(payload["marriage_date"])
         session.add(marriage)
         session.flush()
-        return marriage.to_dict()
+        result = marriage.to_dict()
+        row = MarriageRow.from_marriage(marriage)
+    events.publish(events.MarriageSaved(row, created=False))
+    return result
 
 
 def delete_marriage(marriage_id: int) -> None:
     with get_session() as session:
         marriage = session.get(Marriage, marriage_id)
-        if marriage:
-            session.query(ChildLink).filter(ChildLink.marriage_id == marriage.id).delete()
-            session.delete(marriage)
+        if not marriage:
+            return
+        session.query(ChildLink).filter(ChildLink.marriage_id == marriage.id).delete()
+        session.delete(marriage)
+    events.publish(events.MarriageDeleted(marriage_id))
 
 
 def add_child(marriage_id: int, child_id: int) -> dict:
@@ -72,28 +167,38 @@ def add_child(marriage_id: int, child_id: int) -> dict:
         link.child = child
         session.add(link)
         session.flush()
-        return link.to_dict()
+        result = link.to_dict()
+    events.publish(events.ChildLinked(result["id"], result["marriage_id"], result["child"]))
+    return result
 
 
 def remove_child(link_id: int) -> None:
     with get_session() as session:
         link = session.get(ChildLink, link_id)
-        if link:
-            session.delete(link)
+        if not link:
+            return
+        event = events.ChildUnlinked(link.id, link.marriage_id, link.child_id)
+        session.delete(link)
+    events.publish(event)
+
+
+def _query_children(marriage_id: int) -> Select[tuple[ChildLink]]:
+    return select(ChildLink).where(ChildLink.marriage_id == marriage_id).options(selectinload(ChildLink.child))
+
+
+def _query_child_ids() -> Select[tuple[int]]:
+    return select(ChildLink.child_id)
 
 
 def list_children(marriage_id: int) -> list[dict]:
-    with get_session() as session:
-        stmt = (
-            select(ChildLink)
-            .where(ChildLink.marriage_id == marriage_id)
-            .options(selectinload(ChildLink.child))
-        )
-        children = session.scalars(stmt).all()
+    with get_session(read_only=True) as session:
+        children = session.scalars(_query_children(marriage_id)).all()
         return [child.to_dict() for child in children]
 
 
 def list_child_ids() -> list[int]:
-    with get_session() as session:
-        stmt = select(ChildLink.child_id)
-        return list(session.scalars(stmt).all())
+    with get_session(read_only=True) as session:
+        return list(session.scalars(_query_child_ids()).all())
+
+
+instrumentation.instrument_module(__name__)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
 from typing import Iterable
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, or_, select, text
 
 from ..database import get_session
 from ..models import Person
+from . import events, instrumentation
 
 
 def _parse_date(value: str | None):
@@ -26,16 +28,84 @@ def _query_people() -> Select[tuple[Person]]:
     return select(Person).order_by(Person.name)
 
 
+_fts_available: bool | None = None
+
+
+def _has_fts(session) -> bool:
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = bool(
+            session.bind.dialect.name == "sqlite"
+            and session.scalar(text("SELECT 1 FROM sqlite_master WHERE name = 'person_fts'"))
+        )
+    return _fts_available
+
+
+def _fts_query(keyword: str) -> str | None:
+    """Turn free text into an FTS5 prefix query; every word must match."""
+    words = re.findall(r"\w+", keyword)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
 def list_people() -> list[dict]:
-    with get_session() as session:
+    with get_session(read_only=True) as session:
         people = session.scalars(_query_people()).all()
         return [person.to_dict() for person in people]
 
 
-def search_people(keyword: str) -> list[dict]:
-    pattern = f"%{keyword.lower()}%"
-    with get_session() as session:
-        stmt = select(Person).where(Person.name.ilike(pattern))
+# ``Person.to_dict`` keys kept by list views and pickers; notes are loaded per person.
+ROW_FIELDS = ("id", "name", "gender", "birth_date", "death_date")
+
+
+def list_people_rows() -> list[dict]:
+    """Every person as a ``ROW_FIELDS`` dict, from a column projection ordered by name."""
+    stmt = select(Person.id, Person.name, Person.gender, Person.birth_date, Person.death_date).order_by(Person.name)
+    with get_session(read_only=True) as session:
+        rows = session.execute(stmt).all()
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "gender": row.gender,
+            "birth_date": row.birth_date.isoformat() if row.birth_date else None,
+            "death_date": row.death_date.isoformat() if row.death_date else None,
+        }
+        for row in rows
+    ]
+
+
+def get_notes(person_id: int) -> str:
+    with get_session(read_only=True) as session:
+        return session.scalar(select(Person.notes).where(Person.id == person_id)) or ""
+
+
+def search_people(keyword: str, limit: int = 50, offset: int = 0) -> list[dict]:
+    """Ranked prefix search over name and notes, best matches first.
+
+    Uses the ``person_fts`` index (name weighted above notes) and falls back to
+    a LIKE scan when the database has no FTS5 table.
+    """
+    with get_session(read_only=True) as session:
+        match = _fts_query(keyword)
+        if match and _has_fts(session):
+            stmt = select(Person).from_statement(
+                text(
+                    "SELECT person.* FROM person_fts JOIN person ON person.id = person_fts.rowid "
+                    "WHERE person_fts MATCH :match "
+                    "ORDER BY bm25(person_fts, 10.0, 1.0) LIMIT :limit OFFSET :offset"
+                ).bindparams(match=match, limit=limit, offset=offset)
+            )
+        else:
+            pattern = f"%{keyword.lower()}%"
+            stmt = (
+                select(Person)
+                .where(or_(Person.name.ilike(pattern), Person.notes.ilike(pattern)))
+                .order_by(Person.name)
+                .limit(limit)
+                .offset(offset)
+            )
         people = session.scalars(stmt).all()
         return [person.to_dict() for person in people]
 
@@ -51,7 +121,9 @@ def create_person(payload: dict) -> dict:
     with get_session() as session:
         session.add(person)
         session.flush()
-        return person.to_dict()
+        result = person.to_dict()
+    events.publish(events.PersonSaved(result, created=True))
+    return result
 
 
 def update_person(person_id: int, payload: dict) -> dict:
@@ -68,14 +140,18 @@ def update_person(person_id: int, payload: dict) -> dict:
             person.death_date = _parse_date(payload["death_date"])
         session.add(person)
         session.flush()
-        return person.to_dict()
+        result = person.to_dict()
+    events.publish(events.PersonSaved(result, created=False))
+    return result
 
 
 def delete_person(person_id: int) -> None:
     with get_session() as session:
         person = session.get(Person, person_id)
-        if person:
-            session.delete(person)
+        if not person:
+            return
+        session.delete(person)
+    events.publish(events.PersonDeleted(person_id))
 
 
 def ensure_people(seed_data: Iterable[dict]) -> None:
@@ -92,4 +168,7 @@ def ensure_people(seed_data: Iterable[dict]) -> None:
                     notes=row.get("notes"),
                 )
             )
+    events.publish(events.DataReloaded("seed"))
+
 
+instrumentation.instrument_module(__name__)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from sqlalchemy import Select, or_, select
+
+from ..database import chunked, get_session
+from ..models import ChildLink, Marriage, Person
+from . import instrumentation
+from .family_graph import locked_graph
+
+
+Relative = tuple[int, str]
+
+
+@dataclass(slots=True)
+class Relatives:
+    """Direct relatives of one person as ``(id, name)`` pairs, deduplicated, in link order."""
+
+    parents: list[Relative] = field(default_factory=list)
+    siblings: list[Relative] = field(default_factory=list)
+    spouses: list[Relative] = field(default_factory=list)
+    children: list[Relative] = field(default_factory=list)
+
+
+def _parent_links(child_ids: list[int]) -> Select:
+    return (
+        select(ChildLink.child_id, ChildLink.marriage_id)
+        .where(ChildLink.child_id.in_(child_ids))
+        .order_by(ChildLink.id)
+    )
+
+
+def _spouse_marriages(person_ids: list[int]) -> Select:
+    return (
+        select(Marriage.id, Marriage.husband_id, Marriage.wife_id)
+        .where(or_(Marriage.husband_id.in_(person_ids), Marriage.wife_id.in_(person_ids)))
+        .order_by(Marriage.id)
+    )
+
+
+def _couples(marriage_ids: list[int]) -> Select:
+    return select(Marriage.id, Marriage.husband_id, Marriage.wife_id).where(Marriage.id.in_(marriage_ids))
+
+
+def _child_links(marriage_ids: list[int]) -> Select:
+    return (
+        select(ChildLink.marriage_id, ChildLink.child_id)
+        .where(ChildLink.marriage_id.in_(marriage_ids))
+        .order_by(ChildLink.id)
+    )
+
+
+def _names(person_ids: list[int]) -> Select:
+    return select(Person.id, Person.name).where(Person.id.in_(person_ids))
+
+
+def lookup(person_ids: Iterable[int]) -> dict[int, Relatives]:
+    """Resolve parents, siblings, spouses and children for many people at once.
+
+    Every chunk of ids costs a handful of ``IN (...)`` queries (parent links,
+    marriages, child links, names) no matter how many people it holds.
+    Every requested id gets an entry, empty when nothing is linked.
+    """
+    wanted = list(dict.fromkeys(person_ids))
+    result: dict[int, Relatives] = {person_id: Relatives() for person_id in wanted}
+    with get_session(read_only=True) as session:
+        for ids in chunked(wanted):
+            parent_marriages: dict[int, list[int]] = defaultdict(list)
+            for child_id, marriage_id in session.execute(_parent_links(ids)):
+                parent_marriages[child_id].append(marriage_id)
+
+            couples: dict[int, tuple[int, int]] = {}
+            spouse_marriages: dict[int, list[int]] = defaultdict(list)
+            wanted_ids = set(ids)
+            for marriage_id, husband_id, wife_id in session.execute(_spouse_marriages(ids)):
+                couples[marriage_id] = (husband_id, wife_id)
+                for spouse_id in (husband_id, wife_id):
+                    if spouse_id in wanted_ids:
+                        spouse_marriages[spouse_id].append(marriage_id)
+            parent_ids = {marriage_id for marriage_ids in parent_marriages.values() for marriage_id in marriage_ids}
+            for marriage_ids in chunked(parent_ids - couples.keys()):
+                couples.update(
+                    (marriage_id, (husband_id, wife_id))
+                    for marriage_id, husband_id, wife_id in session.execute(_couples(marriage_ids))
+                )
+
+            children: dict[int, list[int]] = defaultdict(list)
+            for marriage_ids in chunked(couples):
+                for marriage_id, child_id in session.execute(_child_links(marriage_ids)):
+                    children[marriage_id].append(child_id)
+
+            related = {person_id for couple in couples.values() for person_id in couple if person_id}
+            related.update(child_id for child_ids in children.values() for child_id in child_ids)
+            names: dict[int, str] = {}
+            for related_ids in chunked(related):
+                names.update(session.execute(_names(related_ids)).all())
+
+            def collect(candidates: Iterable[int], exclude: int) -> list[Relative]:
+                unique = dict.fromkeys(pid for pid in candidates if pid and pid != exclude and pid in names)
+                return [(pid, names[pid]) for pid in unique]
+
+            for person_id in ids:
+                own = parent_marriages.get(person_id, [])
+                spouse_of = spouse_marriages.get(person_id, [])
+                entry = result[person_id]
+                entry.parents = collect((pid for mid in own for pid in couples.get(mid, ())), person_id)
+                entry.siblings = collect((cid for mid in own for cid in children.get(mid, ())), person_id)
+                entry.spouses = collect((pid for mid in spouse_of for pid in couples[mid]), person_id)
+                entry.children = collect((cid for mid in spouse_of for cid in children.get(mid, ())), person_id)
+    return result
+
+
+def for_person(person_id: int) -> Relatives:
+    """Same answer as ``lookup`` for one person, read from the shared ``FamilyGraph`` without SQL."""
+    with locked_graph() as graph:
+        if person_id not in graph:
+            return Relatives()
+
+        def children(marriage_id: int) -> list[int]:
+            return [graph.child_links[link_id][1] for link_id in sorted(graph.links_by_marriage.get(marriage_id, ()))]
+
+        def collect(candidates: Iterable[int]) -> list[Relative]:
+            unique = dict.fromkeys(pid for pid in candidates if pid and pid != person_id and pid in graph)
+            return [(pid, graph.labels[pid]) for pid in unique]
+
+        own = [graph.child_links[link_id][0] for link_id in sorted(graph.links_by_child.get(person_id, ()))]
+        spouse_of = sorted(graph.spouse_marriages(person_id))
+        return Relatives(
+            parents=collect(pid for mid in own for pid in graph.marriages.get(mid, ())),
+            siblings=collect(cid for mid in own for cid in children(mid)),
+            spouses=collect(pid for mid in spouse_of for pid in graph.marriages[mid]),
+            children=collect(cid for mid in spouse_of for cid in children(mid)),
+        )
+
+
+instrumentation.instrument_module(__name__)
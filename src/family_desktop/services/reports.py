@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 import csv
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from datetime import date
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from sqlalchemy import or_, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, func, select, tuple_
 
 from ..config import settings
-from ..database import get_session
-from ..models import ChildLink, Marriage, Person
+from ..database import chunked, get_session
+from ..models import Marriage, Person
+from . import instrumentation, relatives
+from .marriages import MarriageRow, list_marriage_rows
 
+ProgressCallback = Callable[[int, int], None]
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
 
-def _person_lines(person: Person) -> list[str]:
+
+def _person_lines(person) -> list[str]:
     return [
         f"Nama : {person.name}",
         f"Gender : {person.gender}",
@@ -23,114 +31,52 @@ def _person_lines(person: Person) -> list[str]:
     ]
 
 
-def generate_family_pdf(filename: str = "family-report.pdf") -> str:
-    path = settings.report_dir / filename
-    with get_session() as session:
-        people = session.scalars(select(Person).order_by(Person.name)).all()
-        marriages = session.scalars(
-            select(Marriage).options(selectinload(Marriage.husband), selectinload(Marriage.wife))
-        ).all()
+@dataclass(slots=True)
+class PersonProfile:
+    """Everything a profile PDF prints; plain data so it can be sent to worker processes."""
 
-    pdf = canvas.Canvas(str(path), pagesize=A4)
-    width, height = A4
-    y = height - 50
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(50, y, "Family Tree Report")
-    y -= 30
-    pdf.setFont("Helvetica", 10)
-    for person in people:
-        for line in _person_lines(person):
-            pdf.drawString(50, y, line)
-            y -= 15
-            if y < 60:
-                pdf.showPage()
-                pdf.setFont("Helvetica", 10)
-                y = height - 50
-        pdf.drawString(50, y, "-" * 60)
-        y -= 20
-    pdf.showPage()
-    pdf.setFont("Helvetica-Bold", 14)
-    pdf.drawString(50, height - 50, "Data Pernikahan")
-    y = height - 80
-    pdf.setFont("Helvetica", 10)
-    for marriage in marriages:
-        pdf.drawString(
-            50,
-            y,
-            f"{marriage.husband.name if marriage.husband else '?'} & "
-            f"{marriage.wife.name if marriage.wife else '?'} - {marriage.marriage_date or '-'}",
-        )
-        y -= 20
-        if y < 60:
-            pdf.showPage()
-            pdf.setFont("Helvetica", 10)
-            y = height - 50
-    pdf.save()
-    return str(path)
+    id: int
+    name: str
+    gender: str | None
+    birth_date: date | None
+    death_date: date | None
+    notes: str | None
+    parents: list[str] = field(default_factory=list)
+    siblings: list[str] = field(default_factory=list)
+    spouses: list[str] = field(default_factory=list)
+    children: list[str] = field(default_factory=list)
 
 
-def generate_person_pdf(person_id: int, filename: str | None = None) -> str:
-    with get_session() as session:
-        person = session.get(Person, person_id)
-        if not person:
-            raise ValueError("Person not found")
-        parent_links = session.scalars(
-            select(ChildLink)
-            .where(ChildLink.child_id == person.id)
-            .options(
-                selectinload(ChildLink.marriage).selectinload(Marriage.husband),
-                selectinload(ChildLink.marriage).selectinload(Marriage.wife),
-                selectinload(ChildLink.marriage)
-                .selectinload(Marriage.children)
-                .selectinload(ChildLink.child),
-            )
-        ).all()
-        parents: list[str] = []
-        parent_ids: set[int] = set()
-        siblings: list[str] = []
-        sibling_ids: set[int] = set()
-        for link in parent_links:
-            marriage = link.marriage
-            if not marriage:
-                continue
-            for relative in (marriage.husband, marriage.wife):
-                if relative and relative.id not in parent_ids:
-                    parents.append(relative.name)
-                    parent_ids.add(relative.id)
-            for sibling_link in marriage.children:
-                sibling = sibling_link.child
-                if sibling and sibling.id != person.id and sibling.id not in sibling_ids:
-                    siblings.append(sibling.name)
-                    sibling_ids.add(sibling.id)
-        spouse_marriages = session.scalars(
-            select(Marriage)
-            .where(or_(Marriage.husband_id == person.id, Marriage.wife_id == person.id))
-            .options(
-                selectinload(Marriage.husband),
-                selectinload(Marriage.wife),
-                selectinload(Marriage.children).selectinload(ChildLink.child),
-            )
-        ).all()
-        spouses: list[str] = []
-        spouse_ids: set[int] = set()
-        children: list[str] = []
-        child_ids: set[int] = set()
-        for marriage in spouse_marriages:
-            partner = marriage.wife if marriage.husband_id == person.id else marriage.husband
-            if partner and partner.id not in spouse_ids:
-                spouses.append(partner.name)
-                spouse_ids.add(partner.id)
-            for child_link in marriage.children:
-                child = child_link.child
-                if child and child.id != person.id and child.id not in child_ids:
-                    children.append(child.name)
-                    child_ids.add(child.id)
-    filename = filename or f"{person.name.replace(' ', '_')}.pdf"
-    path = settings.report_dir / filename
-    pdf = canvas.Canvas(str(path), pagesize=A4)
+def load_profiles(person_ids: Iterable[int]) -> list[PersonProfile]:
+    """Load profiles for many people; relatives are resolved in bulk by ``relatives.lookup``.
+
+    Unknown ids are skipped; the result keeps the order of ``person_ids``.
+    """
+    wanted = list(dict.fromkeys(person_ids))
+    profiles: dict[int, PersonProfile] = {}
+    columns = (Person.id, Person.name, Person.gender, Person.birth_date, Person.death_date, Person.notes)
+    with get_session(read_only=True) as session:
+        for ids in chunked(wanted):
+            for row in session.execute(select(*columns).where(Person.id.in_(ids))):
+                profiles[row.id] = PersonProfile(*row)
+    for person_id, family in relatives.lookup(profiles).items():
+        profile = profiles[person_id]
+        profile.parents = [name for _, name in family.parents]
+        profile.siblings = [name for _, name in family.siblings]
+        profile.spouses = [name for _, name in family.spouses]
+        profile.children = [name for _, name in family.children]
+    return [profiles[person_id] for person_id in wanted if person_id in profiles]
+
+
+def _write_profile_pdf(profile: PersonProfile, path: str) -> str:
+    # reportlab is slow to import, so it is loaded on first use rather than at startup.
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(path, pagesize=A4)
     width, height = A4
     pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(50, height - 50, f"Profil {person.name}")
+    pdf.drawString(50, height - 50, f"Profil {profile.name}")
     y = height - 100
 
     def write_lines(lines: list[str], font: str = "Helvetica", size: int = 12, leading: int = 20, indent: int = 50):
@@ -153,22 +99,184 @@ def generate_person_pdf(person_id: int, filename: str | None = None) -> str:
         write_lines([f"- {value}" for value in content], font="Helvetica", size=11, leading=16, indent=60)
         y -= 4
 
-    write_lines(_person_lines(person))
-    write_section("Orang Tua", parents)
-    write_section("Saudara Kandung", siblings)
-    write_section("Pasangan", spouses)
-    write_section("Anak", children)
+    write_lines(_person_lines(profile))
+    write_section("Orang Tua", profile.parents)
+    write_section("Saudara Kandung", profile.siblings)
+    write_section("Pasangan", profile.spouses)
+    write_section("Anak", profile.children)
+    pdf.save()
+    return path
+
+
+def _write_profile_batch(jobs: list[tuple[PersonProfile, str]]) -> list[str]:
+    # Runs in a worker process: pure rendering, no database access.
+    return [_write_profile_pdf(profile, path) for profile, path in jobs]
+
+
+def generate_person_pdf(person_id: int, filename: str | None = None) -> str:
+    profiles = load_profiles([person_id])
+    if not profiles:
+        raise ValueError("Person not found")
+    profile = profiles[0]
+    filename = filename or f"{profile.name.replace(' ', '_')}.pdf"
+    return _write_profile_pdf(profile, str(settings.report_dir / filename))
+
+
+def generate_person_pdfs(
+    person_ids: Iterable[int],
+    directory: str | Path | None = None,
+    progress: ProgressCallback | None = None,
+    max_workers: int | None = None,
+    chunk_size: int = 100,
+) -> list[str]:
+    """Write one profile PDF per person, rendering across a process pool.
+
+    Relationship data is loaded in bulk by the calling process; workers only
+    draw PDFs, so SQLite is never opened from more than one process. File
+    names carry the person id because names are not unique.
+    """
+    person_ids = list(dict.fromkeys(person_ids))
+    output_dir = Path(directory) if directory else settings.report_dir / "profiles"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = len(person_ids)
+    workers = max_workers or os.cpu_count() or 1
+    paths: list[str] = []
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future] = set()
+        try:
+            for ids in chunked(person_ids, chunk_size):
+                jobs = [
+                    (profile, str(output_dir / f"{profile.id}_{_UNSAFE_FILENAME.sub('_', profile.name)}.pdf"))
+                    for profile in load_profiles(ids)
+                ]
+                done += len(ids) - len(jobs)
+                pending.add(pool.submit(_write_profile_batch, jobs))
+                # Keep only a couple of batches per worker in flight to bound memory.
+                while len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        written = future.result()
+                        paths.extend(written)
+                        done += len(written)
+                    if progress:
+                        progress(done, total)
+            for future in as_completed(pending):
+                written = future.result()
+                paths.extend(written)
+                done += len(written)
+                if progress:
+                    progress(done, total)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    if progress:
+        progress(total, total)
+    return paths
+
+
+def _iter_people_rows(chunk_size: int) -> Iterator[Row]:
+    """Yield person rows ordered by name, one short keyset-paged query per chunk."""
+    columns = (Person.id, Person.name, Person.gender, Person.birth_date, Person.death_date, Person.notes)
+    cursor: tuple[str, int] | None = None
+    while True:
+        stmt = select(*columns).order_by(Person.name, Person.id).limit(chunk_size)
+        if cursor is not None:
+            stmt = stmt.where(tuple_(Person.name, Person.id) > tuple_(*cursor))
+        with get_session(read_only=True) as session:
+            rows = session.execute(stmt).all()
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        cursor = (rows[-1].name, rows[-1].id)
+
+
+def _iter_marriage_rows(chunk_size: int) -> Iterator[MarriageRow]:
+    after_id: int | None = None
+    while True:
+        rows = list_marriage_rows(limit=chunk_size, after_id=after_id)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1].id
+
+
+def generate_family_pdf(
+    filename: str = "family-report.pdf",
+    progress: ProgressCallback | None = None,
+    chunk_size: int = 500,
+) -> str:
+    """Write the family report while streaming rows in chunks.
+
+    ``progress(done, total)`` is called after every finished page with the
+    number of people and marriages written so far.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    path = settings.report_dir / filename
+    with get_session(read_only=True) as session:
+        total = (session.scalar(select(func.count(Person.id))) or 0) + (
+            session.scalar(select(func.count(Marriage.id))) or 0
+        )
+    done = 0
+
+    # pageCompression keeps the finished pages ReportLab holds until save() small.
+    pdf = canvas.Canvas(str(path), pagesize=A4, pageCompression=1)
+    width, height = A4
+
+    def new_page(font_size: int = 10):
+        pdf.showPage()
+        pdf.setFont("Helvetica", font_size)
+        if progress:
+            progress(done, total)
+        return height - 50
+
+    y = height - 50
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(50, y, "Family Tree Report")
+    y -= 30
+    pdf.setFont("Helvetica", 10)
+    for person in _iter_people_rows(chunk_size):
+        for line in _person_lines(person):
+            pdf.drawString(50, y, line)
+            y -= 15
+            if y < 60:
+                y = new_page()
+        pdf.drawString(50, y, "-" * 60)
+        y -= 20
+        done += 1
+    new_page()
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(50, height - 50, "Data Pernikahan")
+    y = height - 80
+    pdf.setFont("Helvetica", 10)
+    for marriage in _iter_marriage_rows(chunk_size):
+        pdf.drawString(
+            50,
+            y,
+            f"{marriage.husband_name or '?'} & {marriage.wife_name or '?'} - {marriage.marriage_date or '-'}",
+        )
+        y -= 20
+        done += 1
+        if y < 60:
+            y = new_page()
     pdf.save()
+    if progress:
+        progress(total, total)
     return str(path)
 
 
-def export_people_csv(filename: str = "people.csv") -> str:
+def export_people_csv(filename: str = "people.csv", chunk_size: int = 5000) -> str:
     path = settings.export_dir / filename
-    with get_session() as session:
-        people = session.scalars(select(Person).order_by(Person.name)).all()
-    with path.open("w", newline="", encoding="utf-8") as fh:
+    columns = (Person.id, Person.name, Person.gender, Person.birth_date, Person.death_date, Person.notes)
+    with get_session(read_only=True) as session, path.open("w", newline="", encoding="utf-8") as fh:
         writer = csv.writer(fh)
         writer.writerow(["ID", "Name", "Gender", "Birth", "Death", "Notes"])
+        people = session.execute(
+            select(*columns).order_by(Person.name, Person.id),
+            execution_options={"yield_per": chunk_size},
+        )
         for person in people:
             writer.writerow(
                 [
@@ -181,3 +289,6 @@ def export_people_csv(filename: str = "people.csv") -> str:
                 ]
             )
     return str(path)
+
+
+instrumentation.instrument_module(__name__)
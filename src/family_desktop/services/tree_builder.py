@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
 from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from html import escape
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
 
-from graphviz import Digraph
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from ..config import settings
-from ..database import get_session
-from ..models import ChildLink, Marriage, Person
+from ..database import chunked, get_session
+from ..models import Marriage, Person
+from . import family_graph, instrumentation
+
+if TYPE_CHECKING:
+    from graphviz import Digraph
 
 
 MALE_COLOR = "#CDE7FF"
@@ -19,6 +29,46 @@ NODE_BORDER_COLOR = "#4A5568"
 EDGE_COLOR = "#4B5563"
 LINEAGE_SYMBOL = "★"
 LINEAGE_COLOR = "#2563EB"
+POINTS_PER_INCH = 72
+
+SCOPE_DESCENDANTS = "descendants"
+SCOPE_ANCESTORS = "ancestors"
+SCOPE_HOURGLASS = "hourglass"
+DIAGRAM_SCOPES = (SCOPE_DESCENDANTS, SCOPE_ANCESTORS, SCOPE_HOURGLASS)
+
+
+@dataclass(slots=True)
+class LabelRow:
+    symbol: str
+    color: str
+    text: str
+    lineage: bool = False
+
+
+@dataclass(slots=True)
+class LayoutNode:
+    name: str
+    x: float
+    y: float
+    width: float
+    height: float
+    rows: list[LabelRow]
+
+
+@dataclass(slots=True)
+class LayoutEdge:
+    points: list[tuple[float, float]]
+    arrow_tip: tuple[float, float] | None = None
+
+
+@dataclass(slots=True)
+class DiagramLayout:
+    """Graphviz node/edge geometry in points, y axis pointing down."""
+
+    width: float
+    height: float
+    nodes: list[LayoutNode] = field(default_factory=list)
+    edges: list[LayoutEdge] = field(default_factory=list)
 
 
 def _gender_style(gender: str | None) -> tuple[str, str]:
@@ -43,6 +93,22 @@ def _person_label(person: Person) -> str:
     )
 
 
+def _person_rows(person: Person) -> list[LabelRow]:
+    symbol, color = _gender_style(person.gender)
+    return [LabelRow(symbol, color, person.name)]
+
+
+def _marriage_rows(marriage: Marriage, lineage_people: set[int]) -> list[LabelRow]:
+    rows = []
+    for person, person_id in ((marriage.husband, marriage.husband_id), (marriage.wife, marriage.wife_id)):
+        if not person:
+            rows.append(LabelRow("?", UNKNOWN_COLOR, "Unknown"))
+            continue
+        symbol, color = _gender_style(person.gender)
+        rows.append(LabelRow(symbol, color, person.name, bool(person_id and person_id in lineage_people)))
+    return rows
+
+
 def _marriage_row(person: Person | None, port: str, is_lineage: bool) -> str:
     if not person:
         symbol, color = "?", UNKNOWN_COLOR
@@ -74,73 +140,147 @@ def _marriage_label(marriage: Marriage, lineage_people: set[int]) -> str:
     )
 
 
-def _collect_descendant_scope(
-    root_marriage_id: int,
-    marriages: list[Marriage],
-) -> tuple[set[int], set[int]]:
-    marriages_by_id: dict[int, Marriage] = {marriage.id: marriage for marriage in marriages}
-    if root_marriage_id not in marriages_by_id:
-        raise ValueError("Pernikahan tidak ditemukan")
-
-    marriages_by_person: defaultdict[int, list[int]] = defaultdict(list)
-    for marriage in marriages:
-        if marriage.husband_id:
-            marriages_by_person[marriage.husband_id].append(marriage.id)
-        if marriage.wife_id:
-            marriages_by_person[marriage.wife_id].append(marriage.id)
+def _walk_descendants(
+    graph: family_graph.FamilyGraph,
+    start_marriages: Iterable[int],
+    generations: int | None,
+    marriages: set[int],
+    people: set[int],
+) -> None:
+    """Breadth-first walk down from ``start_marriages``, stopping after ``generations`` levels of children.
 
-    selected_marriages: set[int] = set()
-    selected_people: set[int] = set()
-    queue: deque[int] = deque([root_marriage_id])
+    Married children on the last level still get their marriage node (so the
+    spouse shows up), but their own children are not expanded.
+    """
+    queue: deque[tuple[int, int]] = deque((marriage_id, 0) for marriage_id in start_marriages)
     while queue:
-        current_id = queue.popleft()
-        if current_id in selected_marriages:
+        marriage_id, depth = queue.popleft()
+        if marriage_id in marriages or marriage_id not in graph.marriages:
             continue
-        marriage = marriages_by_id.get(current_id)
-        if not marriage:
+        marriages.add(marriage_id)
+        people.update(spouse_id for spouse_id in graph.marriages[marriage_id] if spouse_id)
+        if generations is not None and depth >= generations:
             continue
-        selected_marriages.add(current_id)
-        for spouse_id in (marriage.husband_id, marriage.wife_id):
-            if spouse_id:
-                selected_people.add(spouse_id)
-        for child_link in marriage.children:
-            selected_people.add(child_link.child_id)
-            for related_marriage in marriages_by_person.get(child_link.child_id, []):
-                if related_marriage not in selected_marriages:
-                    queue.append(related_marriage)
-    return selected_marriages, selected_people
+        for child_id in graph.children_of(marriage_id):
+            people.add(child_id)
+            for next_id in graph.spouse_marriages(child_id):
+                if next_id not in marriages:
+                    queue.append((next_id, depth + 1))
+
 
+def _walk_ancestors(
+    graph: family_graph.FamilyGraph,
+    person_id: int,
+    generations: int | None,
+    marriages: set[int],
+    people: set[int],
+) -> None:
+    people.add(person_id)
+    queue: deque[tuple[int, int]] = deque([(person_id, 0)])
+    while queue:
+        current_id, depth = queue.popleft()
+        if generations is not None and depth >= generations:
+            continue
+        for marriage_id in graph.parent_marriages(current_id):
+            if marriage_id in marriages or marriage_id not in graph.marriages:
+                continue
+            marriages.add(marriage_id)
+            for parent_id in graph.marriages[marriage_id]:
+                if parent_id and parent_id not in people:
+                    people.add(parent_id)
+                    queue.append((parent_id, depth + 1))
+
+
+def collect_scope(
+    scope: str = SCOPE_DESCENDANTS,
+    root_marriage_id: int | None = None,
+    person_id: int | None = None,
+    generations: int | None = None,
+) -> tuple[set[int], set[int]]:
+    """Return ``(marriage_ids, person_ids)`` to draw, walking the in-memory family graph.
 
-def build_tree_image(filename: str = "family_tree", root_marriage_id: int | None = None) -> str:
-    output_path = settings.assets_dir / filename
+    ``generations`` limits the walk itself (``None`` means unlimited), so a
+    scoped diagram only ever touches the rows it is going to draw.
+    """
+    if scope not in DIAGRAM_SCOPES:
+        raise ValueError(f"Cakupan diagram tidak dikenal: {scope}")
+    marriages: set[int] = set()
+    people: set[int] = set()
+    with family_graph.locked_graph() as graph:
+        if scope == SCOPE_DESCENDANTS and root_marriage_id:
+            if root_marriage_id not in graph.marriages:
+                raise ValueError("Pernikahan tidak ditemukan")
+            _walk_descendants(graph, [root_marriage_id], generations, marriages, people)
+            return marriages, people
+        if person_id not in graph:
+            raise ValueError("Orang tidak ditemukan")
+        if scope == SCOPE_DESCENDANTS:
+            people.add(person_id)
+        else:
+            _walk_ancestors(graph, person_id, generations, marriages, people)
+        if scope != SCOPE_ANCESTORS:
+            _walk_descendants(graph, list(graph.spouse_marriages(person_id)), generations, marriages, people)
+    return marriages, people
+
+
+def _load_rows(scoped: tuple[set[int], set[int]] | None) -> tuple[list[Person], list[Marriage]]:
+    marriage_options = (
+        selectinload(Marriage.husband),
+        selectinload(Marriage.wife),
+        selectinload(Marriage.children),
+    )
+    with get_session(read_only=True) as session:
+        if scoped is None:
+            people = list(session.scalars(select(Person).order_by(Person.id)))
+            marriages = list(session.scalars(select(Marriage).options(*marriage_options).order_by(Marriage.id)))
+            return people, marriages
+        marriage_ids, person_ids = scoped
+        people = []
+        for chunk in chunked(sorted(person_ids)):
+            people.extend(session.scalars(select(Person).where(Person.id.in_(chunk)).order_by(Person.id)))
+        marriages = []
+        for chunk in chunked(sorted(marriage_ids)):
+            marriages.extend(
+                session.scalars(
+                    select(Marriage).where(Marriage.id.in_(chunk)).options(*marriage_options).order_by(Marriage.id)
+                )
+            )
+    return people, marriages
+
+
+def _build_digraph(
+    root_marriage_id: int | None,
+    scope: str = SCOPE_DESCENDANTS,
+    person_id: int | None = None,
+    generations: int | None = None,
+) -> tuple[Digraph, dict[str, list[LabelRow]]]:
+    """Build the DOT graph plus the label rows of every node (for vector drawing)."""
+    from graphviz import Digraph
+
+    node_rows: dict[str, list[LabelRow]] = {}
     graph = Digraph("FamilyTree", engine=settings.graphviz_engine, format="png")
     graph.attr(rankdir="TB", nodesep="0.6", ranksep="0.9", splines="curved")
     graph.attr("node", shape="box", style="rounded", fontname="Helvetica", margin="0.12")
     graph.attr("edge", color=EDGE_COLOR, arrowhead="normal", arrowsize="0.8")
 
-    with get_session() as session:
-        people = session.scalars(select(Person)).all()
-        marriages = session.scalars(
-            select(Marriage).options(
-                selectinload(Marriage.husband),
-                selectinload(Marriage.wife),
-                selectinload(Marriage.children).selectinload(ChildLink.child),
-            )
-        ).all()
-
-    if root_marriage_id:
-        selected_marriages, selected_people = _collect_descendant_scope(root_marriage_id, marriages)
-        marriages = [marriage for marriage in marriages if marriage.id in selected_marriages]
-        people = [person for person in people if person.id in selected_people]
+    scoped = None
+    if root_marriage_id or person_id or scope != SCOPE_DESCENDANTS:
+        scoped = collect_scope(scope, root_marriage_id, person_id, generations)
+    people, marriages = _load_rows(scoped)
+    drawn_people = {person.id for person in people}
 
     lineage_people = {
-        child_link.child_id for marriage in marriages for child_link in marriage.children
+        child_link.child_id
+        for marriage in marriages
+        for child_link in marriage.children
+        if child_link.child_id in drawn_people
     }
     person_marriages: dict[int, list[tuple[str, str]]] = defaultdict(list)
 
     for marriage in marriages:
         marriage_node = f"marriage_{marriage.id}"
         graph.node(marriage_node, _marriage_label(marriage, lineage_people))
+        node_rows[marriage_node] = _marriage_rows(marriage, lineage_people)
         if marriage.husband_id:
             person_marriages[marriage.husband_id].append((marriage_node, "husband"))
         if marriage.wife_id:
@@ -150,11 +290,14 @@ def build_tree_image(filename: str = "family_tree", root_marriage_id: int | None
         if person_marriages.get(person.id):
             continue
         graph.node(f"person_{person.id}", _person_label(person))
+        node_rows[f"person_{person.id}"] = _person_rows(person)
 
     for marriage in marriages:
         marriage_node = f"marriage_{marriage.id}"
         child_rank_nodes: list[str] = []
         for child_link in marriage.children:
+            if child_link.child_id not in drawn_people:
+                continue
             targets = person_marriages.get(child_link.child_id)
             if not targets:
                 child_node = f"person_{child_link.child_id}"
@@ -170,5 +313,105 @@ def build_tree_image(filename: str = "family_tree", root_marriage_id: int | None
                 for node_id in set(child_rank_nodes):
                     siblings.node(node_id)
 
-    graph.render(str(output_path), cleanup=True)
-    return str(output_path.with_suffix(".png"))
+    return graph, node_rows
+
+
+def build_tree_image(
+    filename: str = "family_tree",
+    root_marriage_id: int | None = None,
+    scope: str = SCOPE_DESCENDANTS,
+    person_id: int | None = None,
+    generations: int | None = None,
+) -> str:
+    graph, _ = _build_digraph(root_marriage_id, scope, person_id, generations)
+    return str(_render_cached(graph, settings.assets_dir / filename))
+
+
+def build_tree_layout(
+    filename: str = "family_tree",
+    root_marriage_id: int | None = None,
+    scope: str = SCOPE_DESCENDANTS,
+    person_id: int | None = None,
+    generations: int | None = None,
+) -> DiagramLayout:
+    """Run only the Graphviz layout (``json0`` output) so the UI can draw native canvas items."""
+    graph, node_rows = _build_digraph(root_marriage_id, scope, person_id, generations)
+    graph.format = "json0"
+    path = _render_cached(graph, settings.assets_dir / filename)
+    return parse_layout(json.loads(path.read_text(encoding="utf-8")), node_rows)
+
+
+def _parse_points(value: str, height: float) -> tuple[list[tuple[float, float]], tuple[float, float] | None]:
+    points: list[tuple[float, float]] = []
+    tip = None
+    for token in value.split():
+        parts = token.split(",")
+        if parts[0] in ("e", "s"):
+            marker, x, y = parts
+            if marker == "e":
+                tip = (float(x), height - float(y))
+            continue
+        points.append((float(parts[0]), height - float(parts[1])))
+    return points, tip
+
+
+def parse_layout(data: dict, node_rows: dict[str, list[LabelRow]]) -> DiagramLayout:
+    _, _, width, height = (float(value) for value in data["bb"].split(","))
+    layout = DiagramLayout(width, height)
+    for obj in data.get("objects", []):
+        if "pos" not in obj:
+            continue  # rank=same subgraphs carry no geometry
+        x, y = (float(value) for value in obj["pos"].split(","))
+        layout.nodes.append(
+            LayoutNode(
+                name=obj["name"],
+                x=x,
+                y=height - y,
+                width=float(obj["width"]) * POINTS_PER_INCH,
+                height=float(obj["height"]) * POINTS_PER_INCH,
+                rows=node_rows.get(obj["name"], []),
+            )
+        )
+    for edge in data.get("edges", []):
+        if "pos" not in edge:
+            continue
+        points, tip = _parse_points(edge["pos"], height)
+        layout.edges.append(LayoutEdge(points, tip))
+    return layout
+
+
+def _render_cached(graph: Digraph, output_path: Path) -> Path:
+    """Render through a content-addressed cache keyed on DOT source, engine and format."""
+    fingerprint = "\0".join((graph.engine, graph.format, graph.source))
+    digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+    cache_dir = settings.render_cache_dir
+    cached = cache_dir / f"{digest}.{graph.format}"
+    if cached.exists():
+        os.utime(cached)
+    else:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        graph.render(str(cache_dir / digest), cleanup=True)
+        _evict_render_cache(cache_dir, settings.render_cache_mb * 1024 * 1024, keep=cached)
+    target = output_path.with_suffix(f".{graph.format}")
+    shutil.copyfile(cached, target)
+    return target
+
+
+def _evict_render_cache(cache_dir: Path, max_bytes: int, keep: Path) -> None:
+    # mtime doubles as the LRU clock: cache hits touch the file.
+    entries = []
+    for entry in cache_dir.iterdir():
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        if entry == keep:
+            continue
+        entry.unlink(missing_ok=True)
+        total -= size
+
+
+instrumentation.instrument_module(__name__)
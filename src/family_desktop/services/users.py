@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+import functools
+import secrets
+
+from sqlalchemy import select, update
 
 from ..database import get_session
 from ..models import User
-from ..utils.security import hash_password, verify_password
+from ..utils.security import hash_password, needs_rehash, verify_password
+from . import instrumentation
 
 
 def list_users() -> list[dict]:
-    with get_session() as session:
+    with get_session(read_only=True) as session:
         users = session.scalars(select(User)).all()
         return [user.to_dict() for user in users]
 
@@ -24,11 +28,33 @@ def create_user(username: str, password: str, role: str = "admin") -> dict:
 
 
 def authenticate(username: str, password: str) -> dict | None:
-    with get_session() as session:
+    """Check the credentials and upgrade the stored hash when its format or cost is outdated.
+
+    Hashing is deliberately slow, so call this off the Tk thread.
+    """
+    with get_session(read_only=True) as session:
         user = session.scalar(select(User).where(User.username == username))
-        if user and verify_password(password, user.password_hash):
-            return user.to_dict()
+        data = user.to_dict() if user else None
+        stored = user.password_hash if user else None
+    if stored is None:
+        # Spend the same time on unknown usernames so they cannot be told apart.
+        verify_password(password, _dummy_hash())
         return None
+    if not verify_password(password, stored):
+        return None
+    if needs_rehash(stored):
+        with get_session() as session:
+            session.execute(
+                update(User)
+                .where(User.id == data["id"], User.password_hash == stored)
+                .values(password_hash=hash_password(password))
+            )
+    return data
+
+
+@functools.cache
+def _dummy_hash() -> str:
+    return hash_password(secrets.token_hex(16))
 
 
 def ensure_default_admin() -> None:
@@ -38,3 +64,5 @@ def ensure_default_admin() -> None:
         admin = User(username="admin", password_hash=hash_password("admin123"), role="admin")
         session.add(admin)
 
+
+instrumentation.instrument_module(__name__)
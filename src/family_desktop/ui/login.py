@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 
 from ..services import users
+from .tasks import TaskRunner
 
 
 class LoginFrame(ttk.Frame):
@@ -16,6 +17,8 @@ class LoginFrame(ttk.Frame):
         )
         self.username_var = tk.StringVar(value="admin")
         self.password_var = tk.StringVar()
+        self.tasks = TaskRunner(self, max_workers=1)
+        self.bind("<Destroy>", lambda event: self.tasks.shutdown() if event.widget is self else None)
         self._build_form()
 
     def _build_form(self):
@@ -31,19 +34,39 @@ class LoginFrame(ttk.Frame):
         password_entry.grid(row=3, column=0, sticky="ew")
         password_entry.bind("<Return>", lambda _: self._attempt_login())
 
-        ttk.Button(self, text="Login", command=self._attempt_login).grid(
-            row=2, column=0, pady=20, sticky="ew"
-        )
+        self.login_button = ttk.Button(self, text="Login", command=self._attempt_login)
+        self.login_button.grid(row=2, column=0, pady=20, sticky="ew")
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.grid(row=3, column=0)
 
     def _attempt_login(self):
+        if self.tasks.busy:
+            return
         username = self.username_var.get().strip()
         password = self.password_var.get().strip()
         if not username or not password:
             messagebox.showwarning("Login", "Username dan password wajib diisi")
             return
-        user = users.authenticate(username, password)
+        self._set_busy(True)
+        # Password hashing takes a noticeable moment; keep the window responsive meanwhile.
+        self.tasks.submit(
+            lambda task: users.authenticate(username, password),
+            title="Login",
+            on_success=self._on_authenticated,
+            on_error=self._on_login_error,
+        )
+
+    def _set_busy(self, busy: bool):
+        self.login_button.state(["disabled"] if busy else ["!disabled"])
+        self.status_label.configure(text="Memeriksa kredensial..." if busy else "")
+
+    def _on_authenticated(self, user: dict | None):
         if not user:
+            self._set_busy(False)
             messagebox.showerror("Login", "Kredensial salah")
             return
         self.on_success(user)
 
+    def _on_login_error(self, exc: BaseException):
+        self._set_busy(False)
+        messagebox.showerror("Login", str(exc))
@@ -1,26 +1,84 @@
 from __future__ import annotations
 
+import threading
+from bisect import bisect_left, bisect_right, insort
 import tkinter as tk
-from tkinter import messagebox, ttk
+from pathlib import Path
+from tkinter import filedialog, messagebox, ttk
+from typing import TYPE_CHECKING
 
-from PIL import Image, ImageTk
+from ..config import settings
+from ..services import (
+    backup,
+    events,
+    gedcom,
+    instrumentation,
+    kinship,
+    marriages,
+    people,
+    relatives,
+    reports,
+    tree_builder,
+    users,
+)
+from .name_index import NameIndex, SortKey
+from .paging import PagedTreeview
+from .tasks import TaskHandle, TaskRunner
 
-from ..services import kinship, marriages, people, reports, tree_builder, users
+if TYPE_CHECKING:
+    from PIL import ImageTk
+
+    from .tiles import TilePyramid
 
 
 class MainFrame(ttk.Frame):
+    DIAGRAM_SCOPES = {
+        "Keturunan (pernikahan)": tree_builder.SCOPE_DESCENDANTS,
+        "Leluhur (orang)": tree_builder.SCOPE_ANCESTORS,
+        "Jam pasir (orang)": tree_builder.SCOPE_HOURGLASS,
+    }
+
     def __init__(self, master: tk.Misc, current_user: dict):
         super().__init__(master, padding=10)
         self.current_user = current_user
-        self.people_cache: list[dict] = []
-        self.marriage_cache: list[dict] = []
-        self._tree_image = None
-        self._diagram_base_image: Image.Image | None = None
+        self.people_cache: dict[int, dict] = {}
+        self.people_index = NameIndex()
+        self._people_matches: list[SortKey] = []
+        self._people_filter_job: str | None = None
+        self.marriage_cache: dict[int, marriages.MarriageRow] = {}
+        self._marriages_by_person: dict[int, set[int]] = {}
+        # Combobox labels, rebuilt on the next dropdown after the caches change.
+        self._person_labels: dict[str, list[str]] = {}
+        self._marriage_labels: list[str] | None = None
+        self._diagram_pyramid: TilePyramid | None = None
         self._diagram_zoom: float = 1.0
-        self._diagram_canvas_image: int | None = None
+        self._diagram_tiles: dict[tuple[int, int], tuple[int, ImageTk.PhotoImage]] = {}
+        self._diagram_tile_layout: tuple | None = None
+        self._diagram_layout: tree_builder.DiagramLayout | None = None
+        self.tasks = TaskRunner(self)
+        self.bind("<Destroy>", self._on_destroy)
         self._build_header()
+        self._build_status_bar()
         self._build_tabs()
         self._refresh_all()
+        self._tk_thread = threading.current_thread()
+        self._change_handlers = {
+            events.PersonSaved: self._on_person_saved,
+            events.PersonDeleted: self._on_person_deleted,
+            events.MarriageSaved: self._on_marriage_saved,
+            events.MarriageDeleted: self._on_marriage_deleted,
+            events.ChildLinked: self._on_child_linked,
+            events.ChildUnlinked: self._on_child_unlinked,
+            events.DataReloaded: lambda event: self._refresh_all(),
+        }
+        self._unsubscribers = [events.subscribe(kind, self._on_change) for kind in self._change_handlers]
+
+    def _on_destroy(self, event: tk.Event):
+        if event.widget is not self:
+            return
+        self.tasks.shutdown()
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
 
     # region Layout helpers
     def _build_header(self):
@@ -33,6 +91,46 @@ class MainFrame(ttk.Frame):
         ).pack(side="left")
         ttk.Button(header, text="Refresh All", command=self._refresh_all).pack(side="right")
 
+    def _build_status_bar(self):
+        status = ttk.Frame(self)
+        status.pack(side="bottom", fill="x", pady=(5, 0))
+        self.task_label = ttk.Label(status, text="")
+        self.task_label.pack(side="left")
+        self.task_cancel = ttk.Button(status, text="Batal", command=self.tasks.cancel_all, state="disabled")
+        self.task_cancel.pack(side="right")
+        self.task_progress = ttk.Progressbar(status, length=220, mode="indeterminate")
+        self.task_progress.pack(side="right", padx=5)
+
+    def _run_task(self, title: str, job, on_success):
+        """Run ``job(task)`` off the Tk thread and call ``on_success(result)`` back on it."""
+        self.task_label.configure(text=f"{title}...")
+        self.task_progress.configure(mode="indeterminate", value=0)
+        self.task_progress.start(15)
+        self.task_cancel.state(["!disabled"])
+        return self.tasks.submit(
+            job,
+            title=title,
+            on_success=on_success,
+            on_error=lambda exc: messagebox.showerror(title, str(exc)),
+            on_progress=lambda done, total: self._on_task_progress(title, done, total),
+            on_finish=self._on_task_finish,
+        )
+
+    def _on_task_progress(self, title: str, done: int, total: int | None):
+        if not total:
+            return
+        self.task_progress.stop()
+        self.task_progress.configure(mode="determinate", maximum=total, value=done)
+        self.task_label.configure(text=f"{title} {done}/{total}")
+
+    def _on_task_finish(self, task: TaskHandle):
+        if self.tasks.busy:
+            return
+        self.task_progress.stop()
+        self.task_progress.configure(mode="determinate", value=0)
+        self.task_label.configure(text="Dibatalkan" if task.cancelled else "")
+        self.task_cancel.state(["disabled"])
+
     def _build_tabs(self):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True)
@@ -58,6 +156,9 @@ class MainFrame(ttk.Frame):
         self._build_diagram_tab()
         self._build_reports_tab()
         self._build_mahram_tab()
+        self.debug_tab: ttk.Frame | None = None
+        self._debug_refresh_id: str | None = None
+        self.winfo_toplevel().bind("<Control-Shift-D>", lambda event: self._toggle_debug_tab(), add="+")
 
     # endregion
     # region People Tab
@@ -73,7 +174,7 @@ class MainFrame(ttk.Frame):
         self.people_search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.people_search_var)
         search_entry.grid(row=0, column=1, sticky="ew", padx=(5, 0))
-        self.people_search_var.trace_add("write", lambda *_: self._apply_people_filter())
+        self.people_search_var.trace_add("write", lambda *_: self._schedule_people_filter())
 
         columns = ("name", "gender", "birth", "death")
         tree_container = ttk.Frame(frame)
@@ -87,9 +188,23 @@ class MainFrame(ttk.Frame):
         self.people_tree.bind("<<TreeviewSelect>>", lambda _: self._fill_person_form())
         y_scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.people_tree.yview)
         x_scrollbar = ttk.Scrollbar(tree_container, orient="horizontal", command=self.people_tree.xview)
-        self.people_tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.people_tree.configure(xscrollcommand=x_scrollbar.set)
         y_scrollbar.grid(row=0, column=1, sticky="ns")
         x_scrollbar.grid(row=1, column=0, sticky="ew", columnspan=2)
+        self.people_view = PagedTreeview(
+            self.people_tree,
+            y_scrollbar,
+            fetch_page=self._fetch_people_page,
+            to_values=lambda person: (
+                person["name"],
+                person["gender"],
+                person["birth_date"],
+                person["death_date"],
+            ),
+            row_id=lambda person: person["id"],
+            cursor_of=lambda person: (person["name"], person["id"]),
+            fetch_before=self._fetch_people_before,
+        )
         form = ttk.Frame(frame)
         form.grid(row=1, column=1, sticky="nsew")
         form.columnconfigure(0, weight=1)
@@ -123,34 +238,59 @@ class MainFrame(ttk.Frame):
         ttk.Button(btn_frame, text="Baru", command=self._reset_person_form).pack(side="left")
         ttk.Button(btn_frame, text="Simpan", command=self._save_person).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Hapus", command=self._delete_person).pack(side="left")
+        ttk.Label(form, text="Keluarga").grid(row=11, column=0, sticky="w", pady=(10, 0))
+        self.person_relatives_var = tk.StringVar(value="-")
+        ttk.Label(form, textvariable=self.person_relatives_var, wraplength=300, justify="left").grid(
+            row=12, column=0, sticky="w"
+        )
 
     def refresh_people(self):
-        self.people_cache = people.list_people()
+        self._run_task("Memuat data orang", lambda task: people.list_people_rows(), self._load_people)
+
+    def _load_people(self, rows: list[dict]):
+        self.people_cache = {person["id"]: person for person in rows}
+        self.people_index.rebuild(rows)
+        self._person_labels.clear()
         self._apply_people_filter()
+        self._refresh_children_view()
+
+    def _schedule_people_filter(self):
+        # Debounce typing: only the last keystroke within 150 ms runs the query.
+        if self._people_filter_job:
+            self.after_cancel(self._people_filter_job)
+        self._people_filter_job = self.after(150, self._apply_people_filter)
 
     def _apply_people_filter(self):
-        if not hasattr(self, "people_tree"):
-            return
-        term = getattr(self, "people_search_var", None)
-        query = (term.get() if term else "").strip().lower()
-        rows = self.people_cache
-        if query:
-            rows = [person for person in rows if query in (person["name"] or "").lower()]
-        self.people_tree.delete(*self.people_tree.get_children())
-        for person in rows:
-            self.people_tree.insert(
-                "",
-                "end",
-                iid=person["id"],
-                values=(person["name"], person["gender"], person["birth_date"], person["death_date"]),
-            )
+        self._people_filter_job = None
+        if not hasattr(self, "people_view"):
+            return
+        self._people_matches = self.people_index.search(self.people_search_var.get())
+        self.people_view.reset()
+
+    def _fetch_people_page(self, cursor: SortKey | None, limit: int) -> list[dict]:
+        start = 0 if cursor is None else bisect_right(self._people_matches, cursor)
+        return [self.people_cache[person_id] for _, person_id in self._people_matches[start : start + limit]]
+
+    def _fetch_people_before(self, cursor: SortKey, limit: int) -> list[dict]:
+        end = bisect_left(self._people_matches, cursor)
+        return [self.people_cache[person_id] for _, person_id in self._people_matches[max(end - limit, 0) : end]]
+
+    def _update_people_matches(self, person_id: int, old_key: SortKey | None):
+        """Keep the current filter result in step with one changed person."""
+        if old_key is not None:
+            position = bisect_left(self._people_matches, old_key)
+            if position < len(self._people_matches) and self._people_matches[position] == old_key:
+                del self._people_matches[position]
+        new_key = self.people_index.key(person_id)
+        if new_key is not None and self.people_index.matches(person_id, self.people_search_var.get()):
+            self._people_matches.insert(bisect_left(self._people_matches, new_key), new_key)
 
     def _fill_person_form(self):
         selection = self.people_tree.selection()
         if not selection:
             return
         iid = int(selection[0])
-        data = next((p for p in self.people_cache if p["id"] == iid), None)
+        data = self.people_view.get(iid)
         if not data:
             return
         self.person_form_vars["id"].set(iid)
@@ -159,7 +299,29 @@ class MainFrame(ttk.Frame):
         self.person_form_vars["birth"].set(data["birth_date"] or "")
         self.person_form_vars["death"].set(data["death_date"] or "")
         self.person_notes.delete("1.0", "end")
-        self.person_notes.insert("1.0", data["notes"])
+        self.person_relatives_var.set("...")
+        # Notes and relatives come from a worker; the first call may still be loading the family graph.
+        self.tasks.submit(
+            lambda task: (people.get_notes(iid), relatives.for_person(iid)),
+            on_success=lambda result: self._show_person_details(iid, *result),
+            on_error=lambda exc: messagebox.showerror("Orang", str(exc)),
+            on_finish=self._on_task_finish,
+        )
+
+    def _show_person_details(self, person_id: int, notes: str, family: relatives.Relatives):
+        if self.person_form_vars["id"].get() != person_id:
+            return
+        self.person_notes.delete("1.0", "end")
+        self.person_notes.insert("1.0", notes)
+        sections = (
+            ("Orang tua", family.parents),
+            ("Saudara", family.siblings),
+            ("Pasangan", family.spouses),
+            ("Anak", family.children),
+        )
+        self.person_relatives_var.set(
+            "\n".join(f"{title}: {', '.join(name for _, name in group) or '-'}" for title, group in sections)
+        )
 
     def _reset_person_form(self):
         for var in self.person_form_vars.values():
@@ -169,6 +331,7 @@ class MainFrame(ttk.Frame):
                 var.set(0)
         self.person_form_vars["gender"].set("male")
         self.person_notes.delete("1.0", "end")
+        self.person_relatives_var.set("-")
 
     def _save_person(self):
         payload = {
@@ -185,8 +348,6 @@ class MainFrame(ttk.Frame):
                 people.create_person(payload)
             messagebox.showinfo("Data Orang", "Data tersimpan")
             self._reset_person_form()
-            self.refresh_people()
-            self.refresh_marriages()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
 
@@ -199,8 +360,6 @@ class MainFrame(ttk.Frame):
         try:
             people.delete_person(self.person_form_vars["id"].get())
             self._reset_person_form()
-            self.refresh_people()
-            self.refresh_marriages()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
 
@@ -219,11 +378,30 @@ class MainFrame(ttk.Frame):
         search_entry.grid(row=0, column=1, sticky="ew", padx=(5, 0))
         self.marriage_search_var.trace_add("write", lambda *_: self._apply_marriage_filter())
         columns = ("husband", "wife", "date")
-        self.marriage_tree = ttk.Treeview(frame, columns=columns, show="headings", height=10)
+        tree_container = ttk.Frame(frame)
+        tree_container.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        tree_container.columnconfigure(0, weight=1)
+        tree_container.rowconfigure(0, weight=1)
+        self.marriage_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=10)
         for col in columns:
             self.marriage_tree.heading(col, text=col.title())
-        self.marriage_tree.grid(row=1, column=0, sticky="nsew", padx=(0, 10))
+        self.marriage_tree.grid(row=0, column=0, sticky="nsew")
         self.marriage_tree.bind("<<TreeviewSelect>>", lambda _: self._fill_marriage_form())
+        y_scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.marriage_tree.yview)
+        y_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.marriage_view = PagedTreeview(
+            self.marriage_tree,
+            y_scrollbar,
+            fetch_page=self._fetch_marriage_page,
+            to_values=lambda marriage: (
+                marriage.husband_name or "-",
+                marriage.wife_name or "-",
+                marriage.marriage_date,
+            ),
+            row_id=lambda marriage: marriage.id,
+            cursor_of=lambda marriage: marriage.id,
+            fetch_before=self._fetch_marriages_before,
+        )
         form = ttk.Frame(frame)
         form.grid(row=1, column=1, sticky="nsew")
         form.columnconfigure(0, weight=1)
@@ -235,10 +413,10 @@ class MainFrame(ttk.Frame):
             "notes": tk.StringVar(),
         }
         ttk.Label(form, text="Suami").grid(row=0, column=0, sticky="w")
-        self.husband_combo = ttk.Combobox(form, textvariable=self.marriage_form["husband"], state="readonly")
+        self.husband_combo = self._person_combo(form, "male", textvariable=self.marriage_form["husband"])
         self.husband_combo.grid(row=1, column=0, sticky="ew")
         ttk.Label(form, text="Istri").grid(row=2, column=0, sticky="w")
-        self.wife_combo = ttk.Combobox(form, textvariable=self.marriage_form["wife"], state="readonly")
+        self.wife_combo = self._person_combo(form, "female", textvariable=self.marriage_form["wife"])
         self.wife_combo.grid(row=3, column=0, sticky="ew")
         ttk.Label(form, text="Tanggal Nikah").grid(row=4, column=0, sticky="w")
         ttk.Entry(form, textvariable=self.marriage_form["date"]).grid(row=5, column=0, sticky="ew")
@@ -251,53 +429,55 @@ class MainFrame(ttk.Frame):
         ttk.Button(btn_frame, text="Hapus", command=self._delete_marriage).pack(side="left")
 
     def refresh_marriages(self):
-        self.marriage_cache = marriages.list_marriages()
+        self.marriage_cache = {row.id: row for row in marriages.list_marriage_rows()}
+        self._marriages_by_person.clear()
+        for row in self.marriage_cache.values():
+            self._index_marriage(row)
+        self._marriage_labels = None
         self._apply_marriage_filter()
-        self.husband_combo["values"] = self._people_labels_by_gender("male")
-        self.wife_combo["values"] = self._people_labels_by_gender("female")
         self._refresh_marriage_selector()
 
     def _apply_marriage_filter(self):
-        if not hasattr(self, "marriage_tree"):
-            return
-        term = getattr(self, "marriage_search_var", None)
-        query = (term.get() if term else "").strip().lower()
-        rows = self.marriage_cache
-        if query:
-            rows = [
-                marriage
-                for marriage in rows
-                if query in ((marriage.get("husband") or {}).get("name") or "").lower()
-                or query in ((marriage.get("wife") or {}).get("name") or "").lower()
-            ]
-        self.marriage_tree.delete(*self.marriage_tree.get_children())
-        for marriage in rows:
-            self.marriage_tree.insert(
-                "",
-                "end",
-                iid=marriage["id"],
-                values=(
-                    marriage["husband"]["name"] if marriage.get("husband") else "-",
-                    marriage["wife"]["name"] if marriage.get("wife") else "-",
-                    marriage.get("marriage_date"),
-                ),
-            )
+        if not hasattr(self, "marriage_view"):
+            return
+        self.marriage_view.reset()
+
+    def _fetch_marriage_page(self, cursor: int | None, limit: int) -> list[marriages.MarriageRow]:
+        query = self.marriage_search_var.get().strip()
+        return marriages.list_marriage_rows(limit=limit, after_id=cursor, search=query or None)
+
+    def _fetch_marriages_before(self, cursor: int, limit: int) -> list[marriages.MarriageRow]:
+        query = self.marriage_search_var.get().strip()
+        return marriages.list_marriage_rows(limit=limit, before_id=cursor, search=query or None)
+
+    def _marriage_matches_search(self, row: marriages.MarriageRow) -> bool:
+        query = self.marriage_search_var.get().strip().lower()
+        return not query or any(query in (name or "").lower() for name in (row.husband_name, row.wife_name))
+
+    def _index_marriage(self, row: marriages.MarriageRow):
+        for person_id in (row.husband_id, row.wife_id):
+            if person_id:
+                self._marriages_by_person.setdefault(person_id, set()).add(row.id)
+
+    def _unindex_marriage(self, row: marriages.MarriageRow):
+        for person_id in (row.husband_id, row.wife_id):
+            self._marriages_by_person.get(person_id, set()).discard(row.id)
 
     def _fill_marriage_form(self):
         selection = self.marriage_tree.selection()
         if not selection:
             return
         iid = int(selection[0])
-        data = next((m for m in self.marriage_cache if m["id"] == iid), None)
+        data = self.marriage_view.get(iid)
         if not data:
             return
         self.marriage_form["id"].set(iid)
-        if data.get("husband"):
-            self.marriage_form["husband"].set(f"{data['husband']['name']} (#{data['husband']['id']})")
-        if data.get("wife"):
-            self.marriage_form["wife"].set(f"{data['wife']['name']} (#{data['wife']['id']})")
-        self.marriage_form["date"].set(data.get("marriage_date") or "")
-        self.marriage_form["notes"].set(data.get("notes") or "")
+        if data.husband_id:
+            self.marriage_form["husband"].set(f"{data.husband_name} (#{data.husband_id})")
+        if data.wife_id:
+            self.marriage_form["wife"].set(f"{data.wife_name} (#{data.wife_id})")
+        self.marriage_form["date"].set(data.marriage_date or "")
+        self.marriage_form["notes"].set(data.notes or "")
 
     def _reset_marriage_form(self):
         for var in self.marriage_form.values():
@@ -321,7 +501,6 @@ class MainFrame(ttk.Frame):
             else:
                 marriages.create_marriage(payload)
             messagebox.showinfo("Pernikahan", "Data tersimpan")
-            self.refresh_marriages()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
 
@@ -333,7 +512,6 @@ class MainFrame(ttk.Frame):
             return
         marriages.delete_marriage(self.marriage_form["id"].get())
         self._reset_marriage_form()
-        self.refresh_marriages()
 
     # endregion
     # region Children Tab
@@ -341,7 +519,7 @@ class MainFrame(ttk.Frame):
         frame = self.children_tab
         frame.columnconfigure(0, weight=1)
         ttk.Label(frame, text="Pilih Pernikahan").pack(anchor="w")
-        self.marriage_selector = ttk.Combobox(frame, state="readonly")
+        self.marriage_selector = ttk.Combobox(frame, state="readonly", postcommand=self._fill_marriage_combos)
         self.marriage_selector.pack(fill="x")
         self.marriage_selector.bind("<<ComboboxSelected>>", lambda _: self._refresh_children_view())
         self.children_tree = ttk.Treeview(frame, columns=("child",), show="headings", height=10)
@@ -356,11 +534,7 @@ class MainFrame(ttk.Frame):
         ttk.Button(form, text="Hapus Relasi", command=self._remove_child).grid(row=1, column=2)
 
     def _refresh_marriage_selector(self):
-        values = []
-        for marriage in self.marriage_cache:
-            husband = marriage["husband"]["name"] if marriage.get("husband") else "?"
-            wife = marriage["wife"]["name"] if marriage.get("wife") else "?"
-            values.append(f"{marriage['id']} - {husband} & {wife}")
+        values = self._marriage_combo_values()
         prev_value = self.marriage_selector.get()
         self.marriage_selector["values"] = values
         if prev_value not in values:
@@ -376,6 +550,26 @@ class MainFrame(ttk.Frame):
             else:
                 self.diagram_marriage_combo.set("")
 
+    def _marriage_combo_values(self) -> list[str]:
+        if self._marriage_labels is None:
+            self._marriage_labels = [marriage.label for marriage in self.marriage_cache.values()]
+        return self._marriage_labels
+
+    def _fill_marriage_combos(self):
+        values = self._marriage_combo_values()
+        self.marriage_selector["values"] = values
+        self.diagram_marriage_combo["values"] = values
+
+    def _sync_marriage_selection(self):
+        """Keep both marriage combos pointing at existing marriages with up-to-date labels."""
+        first = next(iter(self.marriage_cache.values()), None)
+        selected = self._current_marriage_id()
+        for combo in (self.marriage_selector, self.diagram_marriage_combo):
+            row = self.marriage_cache.get(self._extract_marriage_id(combo.get())) or first
+            combo.set(row.label if row else "")
+        if self._current_marriage_id() != selected:
+            self._refresh_children_view()
+
     def _current_marriage_id(self) -> int | None:
         return self._extract_marriage_id(self.marriage_selector.get())
 
@@ -400,7 +594,6 @@ class MainFrame(ttk.Frame):
         child_id = int(child_text.split(" - ")[0])
         try:
             marriages.add_child(marriage_id, child_id)
-            self._refresh_children_view()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
 
@@ -410,7 +603,6 @@ class MainFrame(ttk.Frame):
             messagebox.showinfo("Hapus", "Pilih relasi anak")
             return
         marriages.remove_child(int(selection[0]))
-        self._refresh_children_view()
 
     # endregion
     # region Diagram Tab
@@ -420,7 +612,9 @@ class MainFrame(ttk.Frame):
         control_frame.pack(pady=10)
         self.diagram_control_frame = control_frame
         ttk.Label(control_frame, text="Pilih Pernikahan").pack(side="left", padx=5)
-        self.diagram_marriage_combo = ttk.Combobox(control_frame, state="readonly", width=35)
+        self.diagram_marriage_combo = ttk.Combobox(
+            control_frame, state="readonly", width=35, postcommand=self._fill_marriage_combos
+        )
         self.diagram_marriage_combo.pack(side="left", padx=5)
         ttk.Button(control_frame, text="Bangun Diagram", command=self._render_diagram).pack(side="left", padx=5)
         ttk.Button(control_frame, text="Zoom In", command=lambda: self._zoom_diagram(1.2)).pack(
@@ -429,6 +623,27 @@ class MainFrame(ttk.Frame):
         ttk.Button(control_frame, text="Zoom Out", command=lambda: self._zoom_diagram(1 / 1.2)).pack(
             side="left", padx=5
         )
+        self.diagram_vector_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            control_frame, text="Mode Vektor", variable=self.diagram_vector_var, command=self._reset_diagram
+        ).pack(side="left", padx=(15, 5))
+
+        scope_frame = ttk.Frame(frame)
+        scope_frame.pack(pady=(0, 10))
+        ttk.Label(scope_frame, text="Cakupan").pack(side="left", padx=5)
+        self.diagram_scope_combo = ttk.Combobox(
+            scope_frame, state="readonly", width=22, values=list(self.DIAGRAM_SCOPES)
+        )
+        self.diagram_scope_combo.set(next(iter(self.DIAGRAM_SCOPES)))
+        self.diagram_scope_combo.pack(side="left", padx=5)
+        ttk.Label(scope_frame, text="Generasi (0 = semua)").pack(side="left", padx=(15, 5))
+        self.diagram_generations = tk.IntVar(value=3)
+        ttk.Spinbox(scope_frame, from_=0, to=50, width=5, textvariable=self.diagram_generations).pack(
+            side="left", padx=5
+        )
+        ttk.Label(scope_frame, text="Orang (leluhur/jam pasir)").pack(side="left", padx=(15, 5))
+        self.diagram_person_combo = self._person_combo(scope_frame, width=30)
+        self.diagram_person_combo.pack(side="left", padx=5)
 
         image_frame = ttk.Frame(frame)
         image_frame.pack(fill="both", expand=True)
@@ -439,68 +654,202 @@ class MainFrame(ttk.Frame):
         self.diagram_canvas.bind("<B1-Motion>", self._drag_canvas)
         self.diagram_canvas.bind("<Configure>", lambda _: self._display_diagram_image())
 
+    def _diagram_request(self) -> dict | None:
+        """Collect scope arguments for ``tree_builder`` from the controls, or warn and return None."""
+        scope = self.DIAGRAM_SCOPES.get(self.diagram_scope_combo.get(), tree_builder.SCOPE_DESCENDANTS)
+        try:
+            generations = int(self.diagram_generations.get()) or None
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("Diagram", "Jumlah generasi harus berupa angka")
+            return None
+        if scope == tree_builder.SCOPE_DESCENDANTS:
+            marriage_id = self._extract_marriage_id(self.diagram_marriage_combo.get())
+            if not marriage_id:
+                messagebox.showwarning("Diagram", "Pilih pernikahan terlebih dahulu")
+                return None
+            name = f"family_tree_{marriage_id}"
+            request = {"root_marriage_id": marriage_id}
+        else:
+            person_id = self._extract_person_id(self.diagram_person_combo.get())
+            if not person_id:
+                messagebox.showwarning("Diagram", "Pilih orang terlebih dahulu")
+                return None
+            name = f"family_tree_{scope}_{person_id}"
+            request = {"person_id": person_id}
+        if generations:
+            name += f"_g{generations}"
+        return {"filename": name, "scope": scope, "generations": generations, **request}
+
     def _render_diagram(self):
-        marriage_id = self._extract_marriage_id(self.diagram_marriage_combo.get())
-        if not marriage_id:
-            messagebox.showwarning("Diagram", "Pilih pernikahan terlebih dahulu")
+        request = self._diagram_request()
+        if not request:
             return
-        try:
-            image_path = tree_builder.build_tree_image(
-                filename=f"family_tree_{marriage_id}", root_marriage_id=marriage_id
-            )
-            self._diagram_base_image = Image.open(image_path)
+
+        if self.diagram_vector_var.get():
+            self._render_vector_diagram(request)
+            return
+
+        def job(task: TaskHandle):
+            from PIL import Image
+
+            from .tiles import TilePyramid
+
+            image_path = tree_builder.build_tree_image(**request)
+            image = Image.open(image_path)
+            image.load()
+            return image_path, TilePyramid(image)
+
+        def done(result):
+            image_path, pyramid = result
+            self._reset_diagram()
+            self._diagram_pyramid = pyramid
             self._set_diagram_zoom_to_fit()
             self._display_diagram_image()
             messagebox.showinfo("Diagram", f"Diagram tersimpan di {image_path}")
-        except Exception as exc:
-            messagebox.showerror("Diagram", f"Gagal membangun diagram: {exc}")
+
+        self._run_task("Membangun diagram", job, done)
+
+    def _render_vector_diagram(self, request: dict):
+        def job(task: TaskHandle):
+            return tree_builder.build_tree_layout(**request)
+
+        def done(layout: tree_builder.DiagramLayout):
+            self._reset_diagram()
+            self._diagram_layout = layout
+            self._draw_vector_layout(layout)
+
+        self._run_task("Membangun diagram", job, done)
+
+    def _reset_diagram(self):
+        self._clear_diagram_tiles()
+        self.diagram_canvas.delete("vector")
+        self._diagram_pyramid = None
+        self._diagram_layout = None
+        self._diagram_zoom = 1.0
+
+    def _draw_vector_layout(self, layout: tree_builder.DiagramLayout):
+        """Draw Graphviz geometry as canvas items; zooming then only rescales coordinates."""
+        canvas = self.diagram_canvas
+        for edge in layout.edges:
+            if len(edge.points) >= 2:
+                canvas.create_line(
+                    *[coord for point in edge.points for coord in point],
+                    smooth="raw",
+                    fill=tree_builder.EDGE_COLOR,
+                    tags=("vector",),
+                )
+            if edge.arrow_tip and edge.points:
+                canvas.create_line(
+                    *edge.points[-1], *edge.arrow_tip, arrow="last", fill=tree_builder.EDGE_COLOR, tags=("vector",)
+                )
+        for node in layout.nodes:
+            left, top = node.x - node.width / 2, node.y - node.height / 2
+            row_height = node.height / max(len(node.rows), 1)
+            symbol_width = min(20.0, node.width / 4)
+            for index, row in enumerate(node.rows):
+                row_top = top + index * row_height
+                canvas.create_rectangle(
+                    left, row_top, left + node.width, row_top + row_height,
+                    fill=row.color, outline="", tags=("vector",),
+                )
+                canvas.create_text(
+                    left + symbol_width / 2, row_top + row_height / 2,
+                    text=row.symbol, tags=("vector", "vector_text"),
+                )
+                text = f"{row.text} {tree_builder.LINEAGE_SYMBOL}" if row.lineage else row.text
+                canvas.create_text(
+                    left + symbol_width + 4, row_top + row_height / 2,
+                    text=text, anchor="w", tags=("vector", "vector_text"),
+                )
+            canvas.create_rectangle(
+                left, top, left + node.width, top + node.height,
+                outline=tree_builder.NODE_BORDER_COLOR, tags=("vector",),
+            )
+        self._set_diagram_zoom_to_fit()
+        canvas.scale("vector", 0, 0, self._diagram_zoom, self._diagram_zoom)
+        self._update_vector_view()
+
+    def _update_vector_view(self):
+        canvas = self.diagram_canvas
+        canvas.itemconfigure("vector_text", font=("Helvetica", -max(int(14 * self._diagram_zoom), 1)))
+        bbox = canvas.bbox("vector")
+        if bbox:
+            canvas.configure(scrollregion=bbox)
 
     def _set_diagram_zoom_to_fit(self):
-        if not self._diagram_base_image:
+        if self._diagram_pyramid:
+            base_width, base_height = self._diagram_pyramid.width, self._diagram_pyramid.height
+        elif self._diagram_layout:
+            base_width, base_height = self._diagram_layout.width, self._diagram_layout.height
+        else:
             return
         self.update_idletasks()
         canvas_width = max(self.diagram_canvas.winfo_width(), 1)
         canvas_height = max(self.diagram_canvas.winfo_height(), 1)
-        base_width = max(self._diagram_base_image.width, 1)
-        base_height = max(self._diagram_base_image.height, 1)
-        scale = min(canvas_width / base_width, canvas_height / base_height)
+        scale = min(canvas_width / max(base_width, 1), canvas_height / max(base_height, 1))
         self._diagram_zoom = max(scale, 0.1)
 
+    def _clear_diagram_tiles(self):
+        self.diagram_canvas.delete("tile")
+        self._diagram_tiles.clear()
+        self._diagram_tile_layout = None
+
     def _display_diagram_image(self):
-        if not self._diagram_base_image:
+        """Place only the tiles that intersect the visible part of the canvas."""
+        pyramid = self._diagram_pyramid
+        if not pyramid:
             return
-        base = self._diagram_base_image
-        target_width = max(1, int(base.width * self._diagram_zoom))
-        target_height = max(1, int(base.height * self._diagram_zoom))
-        if target_width == base.width and target_height == base.height:
-            img = base
-        else:
-            img = base.resize((target_width, target_height), Image.LANCZOS)
+        from PIL import Image, ImageTk
 
-        self._tree_image = ImageTk.PhotoImage(img)
-        canvas_width = max(self.diagram_canvas.winfo_width(), 1)
-        canvas_height = max(self.diagram_canvas.winfo_height(), 1)
+        canvas = self.diagram_canvas
+        zoom = self._diagram_zoom
+        level = pyramid.level_for(zoom)
+        scale = pyramid.scale_for(level, zoom)
+        target_width = max(1, int(pyramid.width * zoom))
+        target_height = max(1, int(pyramid.height * zoom))
+        canvas_width = max(canvas.winfo_width(), 1)
+        canvas_height = max(canvas.winfo_height(), 1)
         display_width = max(target_width, canvas_width)
         display_height = max(target_height, canvas_height)
-        offset_x = (display_width - target_width) / 2
-        offset_y = (display_height - target_height) / 2
-        self.diagram_canvas.configure(scrollregion=(0, 0, display_width, display_height))
-        if self._diagram_canvas_image is None:
-            self._diagram_canvas_image = self.diagram_canvas.create_image(
-                offset_x,
-                offset_y,
-                anchor="nw",
-                image=self._tree_image,
+        offset_x = (display_width - target_width) // 2
+        offset_y = (display_height - target_height) // 2
+        canvas.configure(scrollregion=(0, 0, display_width, display_height))
+
+        layout = (level, scale, offset_x, offset_y)
+        if layout != self._diagram_tile_layout:
+            self._clear_diagram_tiles()
+            self._diagram_tile_layout = layout
+
+        left = canvas.canvasx(0) - offset_x
+        top = canvas.canvasy(0) - offset_y
+        wanted = set()
+        for placement in pyramid.visible_tiles(level, scale, left, top, canvas_width, canvas_height):
+            key = (placement.col, placement.row)
+            wanted.add(key)
+            if key in self._diagram_tiles:
+                continue
+            tile = pyramid.tile(level, placement.col, placement.row)
+            if tile.size != (placement.width, placement.height):
+                tile = tile.resize((placement.width, placement.height), Image.BILINEAR)
+            photo = ImageTk.PhotoImage(tile)
+            item = canvas.create_image(
+                offset_x + placement.x, offset_y + placement.y, anchor="nw", image=photo, tags=("tile",)
             )
-        else:
-            self.diagram_canvas.coords(self._diagram_canvas_image, offset_x, offset_y)
-            self.diagram_canvas.itemconfigure(self._diagram_canvas_image, image=self._tree_image)
+            self._diagram_tiles[key] = (item, photo)
+        for key in [key for key in self._diagram_tiles if key not in wanted]:
+            item, _ = self._diagram_tiles.pop(key)
+            canvas.delete(item)
 
     def _zoom_diagram(self, factor: float):
-        if not self._diagram_base_image:
+        if not self._diagram_pyramid and not self._diagram_layout:
+            return
+        old_zoom = self._diagram_zoom
+        self._diagram_zoom = min(max(old_zoom * factor, 0.1), 5.0)
+        if self._diagram_layout:
+            ratio = self._diagram_zoom / old_zoom
+            self.diagram_canvas.scale("vector", 0, 0, ratio, ratio)
+            self._update_vector_view()
             return
-        new_zoom = self._diagram_zoom * factor
-        self._diagram_zoom = min(max(new_zoom, 0.1), 5.0)
         self._display_diagram_image()
 
     def _start_canvas_drag(self, event):
@@ -510,6 +859,7 @@ class MainFrame(ttk.Frame):
     def _drag_canvas(self, event):
         if hasattr(self, "diagram_canvas"):
             self.diagram_canvas.scan_dragto(event.x, event.y, gain=1)
+            self._display_diagram_image()
 
     # endregion
     # region Reports Tab
@@ -519,14 +869,27 @@ class MainFrame(ttk.Frame):
             fill="x", pady=5
         )
         ttk.Button(frame, text="Ekspor Orang (CSV)", command=self._export_csv).pack(fill="x", pady=5)
+        ttk.Button(frame, text="Ekspor GEDCOM", command=self._export_gedcom).pack(fill="x", pady=5)
+        ttk.Button(frame, text="Impor GEDCOM", command=self._import_gedcom).pack(fill="x", pady=5)
+        ttk.Button(frame, text="Backup Semua Data (ZIP)", command=self._export_backup).pack(fill="x", pady=5)
+        ttk.Button(frame, text="Pulihkan dari Backup", command=self._import_backup).pack(fill="x", pady=5)
         ttk.Label(frame, text="Profil Individu (pilih orang)").pack(anchor="w", pady=(20, 5))
-        self.report_person_combo = ttk.Combobox(frame, state="readonly")
+        self.report_person_combo = self._person_combo(frame)
         self.report_person_combo.pack(fill="x")
         ttk.Button(frame, text="Cetak Profil", command=self._generate_person_pdf).pack(fill="x", pady=5)
+        ttk.Button(
+            frame, text="Cetak Profil Orang Ini & Keturunannya", command=self._generate_branch_pdfs
+        ).pack(fill="x", pady=5)
+        ttk.Button(frame, text="Cetak Profil Semua Orang", command=self._generate_all_person_pdfs).pack(
+            fill="x", pady=5
+        )
 
     def _generate_family_pdf(self):
-        path = reports.generate_family_pdf()
-        messagebox.showinfo("Laporan", f"Laporan keluarga dibuat: {path}")
+        self._run_task(
+            "Laporan keluarga",
+            lambda task: reports.generate_family_pdf(progress=task.report),
+            lambda path: messagebox.showinfo("Laporan", f"Laporan keluarga dibuat: {path}"),
+        )
 
     def _generate_person_pdf(self):
         text = self.report_person_combo.get()
@@ -534,40 +897,247 @@ class MainFrame(ttk.Frame):
             messagebox.showwarning("Profil", "Pilih orang")
             return
         person_id = self._extract_person_id(text)
-        path = reports.generate_person_pdf(person_id)
-        messagebox.showinfo("Profil", f"Profil dibuat di {path}")
+        self._run_task(
+            "Profil individu",
+            lambda task: reports.generate_person_pdf(person_id),
+            lambda path: messagebox.showinfo("Profil", f"Profil dibuat di {path}"),
+        )
+
+    def _generate_branch_pdfs(self):
+        person_id = self._extract_person_id(self.report_person_combo.get())
+        if not person_id:
+            messagebox.showwarning("Profil", "Pilih orang")
+            return
+
+        def job(task: TaskHandle):
+            _, person_ids = tree_builder.collect_scope(tree_builder.SCOPE_DESCENDANTS, person_id=person_id)
+            return reports.generate_person_pdfs(sorted(person_ids), progress=task.report)
+
+        self._run_task("Profil massal", job, self._show_bulk_profiles)
+
+    def _generate_all_person_pdfs(self):
+        person_ids = list(self.people_cache)
+        self._run_task(
+            "Profil massal",
+            lambda task: reports.generate_person_pdfs(person_ids, progress=task.report),
+            self._show_bulk_profiles,
+        )
+
+    def _show_bulk_profiles(self, paths: list[str]):
+        folder = str(Path(paths[0]).parent) if paths else str(settings.report_dir)
+        messagebox.showinfo("Profil", f"{len(paths)} profil dibuat di {folder}")
 
     def _export_csv(self):
-        path = reports.export_people_csv()
-        messagebox.showinfo("Ekspor", f"Data diekspor ke {path}")
+        self._run_task(
+            "Ekspor CSV",
+            lambda task: reports.export_people_csv(),
+            lambda path: messagebox.showinfo("Ekspor", f"Data diekspor ke {path}"),
+        )
+
+    def _export_gedcom(self):
+        path = filedialog.asksaveasfilename(
+            title="Ekspor GEDCOM",
+            initialdir=str(settings.export_dir),
+            initialfile="family.ged",
+            defaultextension=".ged",
+            filetypes=[("GEDCOM", "*.ged"), ("GEDCOM terkompresi", "*.ged.gz")],
+        )
+        if not path:
+            return
+        self._run_task(
+            "Ekspor GEDCOM",
+            lambda task: gedcom.export_gedcom(path, compress=path.endswith(".gz"), progress=task.report),
+            lambda result: messagebox.showinfo("Ekspor", f"Data diekspor ke {result}"),
+        )
+
+    def _import_gedcom(self):
+        path = filedialog.askopenfilename(
+            title="Impor GEDCOM", filetypes=[("GEDCOM", "*.ged"), ("Semua file", "*.*")]
+        )
+        if not path:
+            return
+
+        def done(summary: gedcom.GedcomImportSummary):
+            message = (
+                f"{summary.people} orang, {summary.marriages} pernikahan, "
+                f"{summary.children} relasi anak diimpor."
+            )
+            if summary.skipped_families:
+                message += f"\n{summary.skipped_families} keluarga dilewati (pasangan tidak lengkap)."
+            messagebox.showinfo("Impor GEDCOM", message)
+
+        self._run_task("Impor GEDCOM", lambda task: gedcom.import_gedcom(path, progress=task.report), done)
+
+    def _export_backup(self):
+        self._run_task(
+            "Backup data",
+            lambda task: backup.export_backup(progress=task.report),
+            lambda path: messagebox.showinfo("Backup", f"Backup dibuat: {path}"),
+        )
+
+    def _import_backup(self):
+        path = filedialog.askopenfilename(
+            title="Pulihkan Backup",
+            initialdir=str(settings.export_dir),
+            filetypes=[("Backup ZIP", "*.zip"), ("Semua file", "*.*")],
+        )
+        if not path:
+            return
+        replace = messagebox.askyesnocancel(
+            "Pulihkan",
+            "Ganti seluruh data (termasuk akun pengguna) dengan isi backup?\n\n"
+            "Ya: ganti data saat ini\nTidak: tambahkan isi backup ke data saat ini",
+            default=messagebox.NO,
+        )
+        if replace is None:
+            return
+        if replace and not messagebox.askokcancel(
+            "Pulihkan",
+            "Semua data saat ini, termasuk akun pengguna, akan dihapus. Lanjutkan?",
+            icon=messagebox.WARNING,
+            default=messagebox.CANCEL,
+        ):
+            return
+
+        def done(summary: backup.BackupImportSummary):
+            rows = ", ".join(f"{table}: {count}" for table, count in summary.imported.items())
+            messagebox.showinfo("Pulihkan", f"Data dipulihkan ({rows})")
+
+        self._run_task(
+            "Pulihkan backup",
+            lambda task: backup.import_backup(path, progress=task.report, replace=replace),
+            done,
+        )
 
     # endregion
     # region Mahram
     def _build_mahram_tab(self):
         frame = self.mahram_tab
         ttk.Label(frame, text="Orang 1").grid(row=0, column=0, sticky="w")
-        self.mahram_a = ttk.Combobox(frame, state="readonly")
+        self.mahram_a = self._person_combo(frame)
         self.mahram_a.grid(row=1, column=0, sticky="ew")
         ttk.Label(frame, text="Orang 2").grid(row=2, column=0, sticky="w")
-        self.mahram_b = ttk.Combobox(frame, state="readonly")
+        self.mahram_b = self._person_combo(frame)
         self.mahram_b.grid(row=3, column=0, sticky="ew")
-        ttk.Button(frame, text="Cari Relasi", command=self._search_mahram).grid(row=4, column=0, pady=10)
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=4, column=0, pady=10)
+        ttk.Button(button_frame, text="Cari Relasi", command=self._search_mahram).pack(side="left")
+        ttk.Button(button_frame, text="Semua Relasi Orang 1", command=self._list_relatives).pack(
+            side="left", padx=5
+        )
         self.mahram_result = ttk.Label(frame, text="")
         self.mahram_result.grid(row=5, column=0, sticky="w")
 
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(6, weight=1)
+        columns = ("name", "distance", "status", "path")
+        tree_container = ttk.Frame(frame)
+        tree_container.grid(row=6, column=0, sticky="nsew", pady=(10, 0))
+        tree_container.columnconfigure(0, weight=1)
+        tree_container.rowconfigure(0, weight=1)
+        self.relatives_tree = ttk.Treeview(tree_container, columns=columns, show="headings", height=12)
+        self.relatives_tree.grid(row=0, column=0, sticky="nsew")
+        headings = {"name": "Nama", "distance": "Jarak", "status": "Status", "path": "Jalur"}
+        for col in columns:
+            self.relatives_tree.heading(
+                col, text=headings[col], command=lambda c=col: self._sort_relatives(c)
+            )
+        # Paths are filled in for visible rows only, so they cannot be sorted on.
+        self.relatives_tree.heading("path", command="")
+        self.relatives_tree.column("distance", width=60, anchor="center")
+        self.relatives_tree.column("status", width=110)
+        self.relatives_tree.column("path", width=480)
+        self.relatives_scrollbar = ttk.Scrollbar(
+            tree_container, orient="vertical", command=self.relatives_tree.yview
+        )
+        self.relatives_tree.configure(yscrollcommand=self._on_relatives_scroll)
+        self.relatives_scrollbar.grid(row=0, column=1, sticky="ns")
+        self._relatives: dict[int, kinship.RelativeResult] = {}
+        self._relatives_root: str = ""
+
     def _search_mahram(self):
         pid_a = self._extract_person_id(self.mahram_a.get())
         pid_b = self._extract_person_id(self.mahram_b.get())
         if not pid_a or not pid_b:
             messagebox.showwarning("Relasi", "Pilih dua orang")
             return
-        result = kinship.find_relationship(pid_a, pid_b)
+        self._run_task(
+            "Pencarian relasi",
+            lambda task: kinship.find_relationship(pid_a, pid_b),
+            self._show_relationship,
+        )
+
+    def _show_relationship(self, result: kinship.RelationshipResult | None):
         if not result:
             self.mahram_result.configure(text="Tidak ditemukan hubungan")
             return
         text = f"Jarak {result.distance} - {'Mahram' if result.is_mahram else 'Bukan Mahram'}\n{' -> '.join(result.path)}"
         self.mahram_result.configure(text=text)
 
+    def _list_relatives(self):
+        person_id = self._extract_person_id(self.mahram_a.get())
+        if not person_id:
+            messagebox.showwarning("Relasi", "Pilih Orang 1")
+            return
+        root_name = self.people_cache[person_id]["name"] if person_id in self.people_cache else ""
+        self._run_task(
+            "Pencarian kerabat",
+            lambda task: kinship.find_relatives(person_id),
+            lambda results: self._show_relatives(results, root_name),
+        )
+
+    def _show_relatives(self, results: list[kinship.RelativeResult], root_name: str):
+        self.relatives_tree.delete(*self.relatives_tree.get_children())
+        self._relatives = {row.person_id: row for row in results}
+        self._relatives_root = root_name
+        for row in results:
+            self.relatives_tree.insert(
+                "",
+                "end",
+                iid=row.person_id,
+                values=(row.name, row.distance, "Mahram" if row.is_mahram else "Bukan Mahram", ""),
+            )
+        mahram_count = sum(1 for row in results if row.is_mahram)
+        self.mahram_result.configure(text=f"{len(results)} kerabat ditemukan, {mahram_count} mahram")
+        self.after_idle(self._fill_relative_paths)
+
+    def _on_relatives_scroll(self, first: str, last: str):
+        self.relatives_scrollbar.set(first, last)
+        self._fill_relative_paths()
+
+    def _fill_relative_paths(self):
+        """Write the "Jalur" cell of the rows currently in view."""
+        rows = self.relatives_tree.get_children()
+        if not rows:
+            return
+        first, last = self.relatives_tree.yview()
+        for iid in rows[int(first * len(rows)) : int(last * len(rows)) + 1]:
+            if self.relatives_tree.set(iid, "path"):
+                continue
+            names = [
+                self._relatives[node].name if node in self._relatives else self._relatives_root
+                for node in kinship.relative_path(self._relatives, int(iid))
+            ]
+            self.relatives_tree.set(iid, "path", " -> ".join(names))
+
+    def _sort_relatives(self, column: str):
+        self._sort_treeview(self.relatives_tree, column)
+        self._fill_relative_paths()
+
+    def _sort_treeview(self, tree: ttk.Treeview, column: str):
+        descending = getattr(tree, "_sort_state", None) == (column, False)
+        tree._sort_state = (column, descending)
+
+        def key(iid: str):
+            value = tree.set(iid, column)
+            try:
+                return (0, float(value), "")
+            except ValueError:
+                return (1, 0.0, value.lower())
+
+        for index, iid in enumerate(sorted(tree.get_children(""), key=key, reverse=descending)):
+            tree.move(iid, "", index)
+
     # endregion
     # region User Tab
     def _build_user_tab(self):
@@ -613,6 +1183,200 @@ class MainFrame(ttk.Frame):
         except Exception as exc:
             messagebox.showerror("User", str(exc))
 
+    # endregion
+    # region Change events
+    def _on_change(self, event: events.ChangeEvent):
+        handler = self._change_handlers[type(event)]
+        if threading.current_thread() is self._tk_thread:
+            handler(event)
+        else:
+            # Published from a TaskRunner job; its poll loop drains this before the job's own callbacks.
+            self.tasks.post(handler, event)
+
+    def _on_person_saved(self, event: events.PersonSaved):
+        person = event.person
+        previous = self.people_cache.get(person["id"])
+        person = self.people_cache[person["id"]] = {field: person[field] for field in people.ROW_FIELDS}
+        self._person_labels.clear()
+        old_key = self.people_index.key(person["id"])
+        self.people_index.add(person["id"], person["name"])
+        self._update_people_matches(person["id"], old_key)
+        if self.people_index.matches(person["id"], self.people_search_var.get()):
+            self.people_view.upsert(person)
+        else:
+            self.people_view.remove(person["id"])
+        if previous is None:
+            self._update_child_candidate(person["id"], person, add=True)
+            return
+        if previous["name"] == person["name"]:
+            return
+        self._update_child_candidate(person["id"], person)
+        for marriage_id in self._marriages_by_person.get(person["id"], ()):
+            row = self.marriage_cache[marriage_id]
+            if row.husband_id == person["id"]:
+                row.husband_name = person["name"]
+            if row.wife_id == person["id"]:
+                row.wife_name = person["name"]
+            self._show_marriage(row)
+        self._marriage_labels = None
+        self._sync_marriage_selection()
+        for iid in self.children_tree.get_children():
+            if self._extract_person_id(self.children_tree.set(iid, "child")) == person["id"]:
+                self.children_tree.set(iid, "child", f"{person['name']} (#{person['id']})")
+
+    def _on_person_deleted(self, event: events.PersonDeleted):
+        self.people_cache.pop(event.person_id, None)
+        self._person_labels.clear()
+        old_key = self.people_index.key(event.person_id)
+        self.people_index.remove(event.person_id)
+        self._update_people_matches(event.person_id, old_key)
+        self.people_view.remove(event.person_id)
+        self._update_child_candidate(event.person_id, None)
+        for iid in self.children_tree.get_children():
+            if self._extract_person_id(self.children_tree.set(iid, "child")) == event.person_id:
+                self.children_tree.delete(iid)
+
+    def _show_marriage(self, row: marriages.MarriageRow):
+        if self._marriage_matches_search(row):
+            self.marriage_view.upsert(row)
+        else:
+            self.marriage_view.remove(row.id)
+
+    def _on_marriage_saved(self, event: events.MarriageSaved):
+        row = event.marriage
+        previous = self.marriage_cache.get(row.id)
+        if previous is not None:
+            self._unindex_marriage(previous)
+        self.marriage_cache[row.id] = row
+        self._index_marriage(row)
+        self._marriage_labels = None
+        self._show_marriage(row)
+        self._sync_marriage_selection()
+        if previous is not None and row.id == self._current_marriage_id():
+            # New spouses change which people may be added as children.
+            self._refresh_child_combo_options(row.id)
+
+    def _on_marriage_deleted(self, event: events.MarriageDeleted):
+        row = self.marriage_cache.pop(event.marriage_id, None)
+        if row is not None:
+            self._unindex_marriage(row)
+        self._marriage_labels = None
+        self.marriage_view.remove(event.marriage_id)
+        self._sync_marriage_selection()
+
+    def _update_child_candidate(self, person_id: int, person: dict | None, add: bool = False):
+        """Relabel or drop one person in the "Tambah Anak" picker; ``add`` offers a new person."""
+        marriage_id = self._current_marriage_id()
+        if not marriage_id:
+            return
+        prefix = f"{person_id} - "
+        current = list(self.child_combo["values"])
+        values = [value for value in current if not value.startswith(prefix)]
+        marriage = self._find_marriage(marriage_id)
+        is_spouse = marriage is not None and person_id in (marriage.husband_id, marriage.wife_id)
+        # Renames keep whatever candidacy the person had; a new person is never linked yet.
+        offered = (add and not is_spouse) or len(values) < len(current)
+        if person is not None and offered:
+            insort(values, f"{prefix}{person['name']}", key=lambda value: value.split(" - ", 1)[1].lower())
+        selected = self.child_combo.get()
+        self.child_combo["values"] = values
+        if selected.startswith(prefix):
+            selected = f"{prefix}{person['name']}" if person is not None and offered else ""
+        self.child_combo.set(selected if selected in values else (values[0] if values else ""))
+
+    def _on_child_linked(self, event: events.ChildLinked):
+        if event.marriage_id != self._current_marriage_id() or self.children_tree.exists(event.link_id):
+            return
+        child = event.child
+        self.children_tree.insert("", "end", iid=event.link_id, values=(f"{child['name']} (#{child['id']})",))
+        values = [value for value in self.child_combo["values"] if not value.startswith(f"{child['id']} - ")]
+        self.child_combo["values"] = values
+        if self.child_combo.get() not in values:
+            self.child_combo.set(values[0] if values else "")
+
+    def _on_child_unlinked(self, event: events.ChildUnlinked):
+        if event.marriage_id != self._current_marriage_id():
+            return
+        if self.children_tree.exists(event.link_id):
+            self.children_tree.delete(event.link_id)
+        # The child may still belong to another marriage, which only the database knows.
+        self._refresh_child_combo_options(event.marriage_id)
+
+    # endregion
+    # region Debug Tab
+    DEBUG_COLUMNS = (
+        ("function", "Fungsi", 220),
+        ("calls", "Panggilan", 80),
+        ("p50", "p50 ms", 80),
+        ("p95", "p95 ms", 80),
+        ("p99", "p99 ms", 80),
+        ("max", "Maks ms", 80),
+        ("sql", "SQL rata2", 80),
+        ("sql_max", "SQL maks", 80),
+        ("rows", "Baris rata2", 90),
+        ("errors", "Error", 60),
+    )
+
+    def _toggle_debug_tab(self):
+        """Ctrl+Shift+D shows or hides the service metrics tab."""
+        if self.debug_tab is None:
+            self.debug_tab = ttk.Frame(self.notebook, padding=10)
+            self._build_debug_tab()
+        if str(self.debug_tab) in self.notebook.tabs():
+            self.notebook.forget(self.debug_tab)
+            return
+        self.notebook.add(self.debug_tab, text="Debug")
+        self.notebook.select(self.debug_tab)
+        self._refresh_debug_tab()
+
+    def _build_debug_tab(self):
+        frame = self.debug_tab
+        actions = ttk.Frame(frame)
+        actions.pack(fill="x", pady=(0, 5))
+        ttk.Button(actions, text="Refresh", command=self._refresh_debug_tab).pack(side="left")
+        ttk.Button(actions, text="Reset", command=self._reset_debug_stats).pack(side="left", padx=5)
+        if settings.instrumentation:
+            text = f"Log: {settings.metrics_log or '-'}"
+        else:
+            text = "Instrumentasi nonaktif (FAMILY_INSTRUMENTATION=0)"
+        ttk.Label(actions, text=text).pack(side="right")
+        self.debug_tree = ttk.Treeview(frame, columns=[column for column, _, _ in self.DEBUG_COLUMNS], show="headings")
+        for column, title, width in self.DEBUG_COLUMNS:
+            self.debug_tree.heading(column, text=title)
+            self.debug_tree.column(column, width=width, anchor="w" if column == "function" else "e")
+        self.debug_tree.pack(fill="both", expand=True)
+
+    def _refresh_debug_tab(self):
+        if self._debug_refresh_id:
+            self.after_cancel(self._debug_refresh_id)
+            self._debug_refresh_id = None
+        if self.debug_tab is None or str(self.debug_tab) not in self.notebook.tabs():
+            return
+        self.debug_tree.delete(*self.debug_tree.get_children())
+        for stats in instrumentation.snapshot():
+            self.debug_tree.insert(
+                "",
+                "end",
+                values=(
+                    stats.name,
+                    stats.calls,
+                    f"{stats.p50_ms:.1f}",
+                    f"{stats.p95_ms:.1f}",
+                    f"{stats.p99_ms:.1f}",
+                    f"{stats.max_ms:.1f}",
+                    f"{stats.avg_statements:.1f}",
+                    stats.max_statements,
+                    "-" if stats.avg_rows is None else f"{stats.avg_rows:.0f}",
+                    stats.errors,
+                ),
+            )
+        # Keeps polling while the tab is shown; hiding it ends the loop.
+        self._debug_refresh_id = self.after(2000, self._refresh_debug_tab)
+
+    def _reset_debug_stats(self):
+        instrumentation.reset()
+        self._refresh_debug_tab()
+
     # endregion
     def _people_labels_by_gender(self, gender: str) -> list[str]:
         target = (gender or "").strip().lower()
@@ -632,7 +1396,20 @@ class MainFrame(ttk.Frame):
                 return norm in female_aliases
             return True
 
-        return [f"{p['name']} (#{p['id']})" for p in self.people_cache if matches(p.get("gender"))]
+        ordered = sorted(self.people_cache.values(), key=lambda p: (p["name"] or "", p["id"]))
+        return [f"{p['name']} (#{p['id']})" for p in ordered if matches(p.get("gender"))]
+
+    def _person_combo(self, master: tk.Misc, gender: str = "", **options) -> ttk.Combobox:
+        """Readonly person picker whose values are filled when the dropdown opens."""
+        combo = ttk.Combobox(master, state="readonly", **options)
+
+        def fill():
+            if gender not in self._person_labels:
+                self._person_labels[gender] = self._people_labels_by_gender(gender)
+            combo["values"] = self._person_labels[gender]
+
+        combo.configure(postcommand=fill)
+        return combo
 
     def _extract_person_id(self, label: str) -> int | None:
         if not label or "#" not in label:
@@ -650,10 +1427,10 @@ class MainFrame(ttk.Frame):
         except ValueError:
             return None
 
-    def _find_marriage(self, marriage_id: int | None) -> dict | None:
+    def _find_marriage(self, marriage_id: int | None) -> marriages.MarriageRow | None:
         if not marriage_id:
             return None
-        return next((m for m in self.marriage_cache if m["id"] == marriage_id), None)
+        return self.marriage_cache.get(marriage_id)
 
     def _refresh_child_combo_options(self, marriage_id: int | None, children_rows: list[dict] | None = None):
         if not hasattr(self, "child_combo"):
@@ -667,11 +1444,8 @@ class MainFrame(ttk.Frame):
         used_ids.update({row["child"]["id"] for row in children_rows if row.get("child")})
         marriage = self._find_marriage(marriage_id)
         if marriage:
-            for role in ("husband", "wife"):
-                person = marriage.get(role)
-                if person:
-                    used_ids.add(person["id"])
-        candidates = [p for p in self.people_cache if p["id"] not in used_ids]
+            used_ids.update(pid for pid in (marriage.husband_id, marriage.wife_id) if pid)
+        candidates = [p for p in self.people_cache.values() if p["id"] not in used_ids]
         candidates.sort(key=lambda item: (item["name"] or "").lower())
         values = [f"{p['id']} - {p['name']}" for p in candidates]
         self.child_combo["values"] = values
@@ -681,11 +1455,7 @@ class MainFrame(ttk.Frame):
             self.child_combo.set("")
 
     def _refresh_all(self):
+        # The children view needs the people cache; it is refreshed once the people load.
         self.refresh_people()
         self.refresh_marriages()
-        self._refresh_children_view()
         self.refresh_users()
-        combos = [self.report_person_combo, self.mahram_a, self.mahram_b]
-        values = [f"{p['name']} (#{p['id']})" for p in self.people_cache]
-        for combo in combos:
-            combo["values"] = values
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Iterable
+
+_WORD = re.compile(r"\w+")
+
+SortKey = tuple[str, int]
+
+
+def normalize(text: str | None) -> list[str]:
+    """Case-folded words of ``text`` without diacritics, so "Zulaikhā" matches "zulaikha"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _WORD.findall(stripped.casefold())
+
+
+def _matches(words: tuple[str, ...], terms: tuple[str, ...]) -> bool:
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+class NameIndex:
+    """Word-prefix index over person names for the people filter.
+
+    A name matches when every query word starts one of its words, the same
+    rule as the FTS search in ``services.people``. Results are ``(name, id)``
+    keys in the order of the people list. A query that extends the previous
+    one (more letters or more words) only filters the previous matches.
+    """
+
+    def __init__(self):
+        self._keys: dict[int, SortKey] = {}
+        self._words_of: dict[int, tuple[str, ...]] = {}
+        self._ids_by_word: dict[str, set[int]] = {}
+        # Distinct words in sorted order; a prefix selects one contiguous slice.
+        self._words: list[str] = []
+        self._all: list[SortKey] | None = None
+        self._last: tuple[tuple[str, ...], set[int]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def rebuild(self, people: Iterable[dict]) -> None:
+        self._keys.clear()
+        self._words_of.clear()
+        self._ids_by_word.clear()
+        for person in people:
+            person_id = person["id"]
+            words = tuple(dict.fromkeys(normalize(person["name"])))
+            self._keys[person_id] = (person["name"] or "", person_id)
+            self._words_of[person_id] = words
+            for word in words:
+                self._ids_by_word.setdefault(word, set()).add(person_id)
+        self._words = sorted(self._ids_by_word)
+        self._all = None
+        self._last = None
+
+    def add(self, person_id: int, name: str) -> None:
+        """Index ``name`` for ``person_id``, replacing what was indexed for it before."""
+        self.remove(person_id)
+        words = tuple(dict.fromkeys(normalize(name)))
+        key = self._keys[person_id] = (name or "", person_id)
+        self._words_of[person_id] = words
+        if self._all is not None:
+            insort(self._all, key)
+        for word in words:
+            ids = self._ids_by_word.get(word)
+            if ids is None:
+                ids = self._ids_by_word[word] = set()
+                insort(self._words, word)
+            ids.add(person_id)
+        self._last = None
+
+    def remove(self, person_id: int) -> None:
+        words = self._words_of.pop(person_id, None)
+        if words is None:
+            return
+        key = self._keys.pop(person_id)
+        if self._all is not None:
+            del self._all[bisect_left(self._all, key)]
+        for word in words:
+            ids = self._ids_by_word[word]
+            ids.discard(person_id)
+            if not ids:
+                del self._ids_by_word[word]
+                del self._words[bisect_left(self._words, word)]
+        self._last = None
+
+    def key(self, person_id: int) -> SortKey | None:
+        return self._keys.get(person_id)
+
+    def matches(self, person_id: int, query: str) -> bool:
+        words = self._words_of.get(person_id)
+        return words is not None and _matches(words, tuple(normalize(query)))
+
+    def search(self, query: str) -> list[SortKey]:
+        """Sorted keys of every indexed person matching ``query``; a fresh list the caller may edit."""
+        terms = tuple(normalize(query))
+        if not terms:
+            if self._all is None:
+                self._all = sorted(self._keys.values())
+            return list(self._all)
+        if self._last is not None and " ".join(terms).startswith(" ".join(self._last[0])):
+            found = {person_id for person_id in self._last[1] if _matches(self._words_of[person_id], terms)}
+        else:
+            found = self._lookup(terms)
+        self._last = (terms, found)
+        return sorted(self._keys[person_id] for person_id in found)
+
+    def _lookup(self, terms: tuple[str, ...]) -> set[int]:
+        groups = sorted((self._prefix_ids(term) for term in set(terms)), key=len)
+        found = set(groups[0])
+        for ids in groups[1:]:
+            found &= ids
+        return found
+
+    def _prefix_ids(self, term: str) -> set[int]:
+        found: set[int] = set()
+        position = bisect_left(self._words, term)
+        while position < len(self._words) and self._words[position].startswith(term):
+            found |= self._ids_by_word[self._words[position]]
+            position += 1
+        return found
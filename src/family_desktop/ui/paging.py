@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Callable
+
+from tkinter import ttk
+
+FetchPage = Callable[[Any, int], list]
+
+
+class PagedTreeview:
+    """Feed a Treeview from a keyset-paginated source one page at a time.
+
+    Only the first page is inserted on reset; further pages are fetched when
+    the vertical scrollbar approaches the end of the loaded rows, so a refresh
+    costs one page of inserts regardless of how large the table is. Single
+    edits go through ``upsert``/``remove`` and keep the loaded rows in cursor
+    order without refetching.
+
+    With ``fetch_before`` (rows before a cursor, in cursor order) at most
+    ``max_pages`` pages stay loaded: scrolling down drops pages from the top,
+    and scrolling back up fetches them again while dropping pages from the
+    bottom, so memory stays flat however far the user scrolls.
+    """
+
+    def __init__(
+        self,
+        tree: ttk.Treeview,
+        scrollbar: ttk.Scrollbar,
+        fetch_page: FetchPage,
+        to_values: Callable[[Any], tuple],
+        row_id: Callable[[Any], int],
+        cursor_of: Callable[[Any], Any],
+        page_size: int = 200,
+        prefetch_at: float = 0.85,
+        fetch_before: FetchPage | None = None,
+        max_pages: int = 5,
+    ):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.to_values = to_values
+        self.row_id = row_id
+        self.cursor_of = cursor_of
+        self.page_size = page_size
+        self.prefetch_at = prefetch_at
+        self.fetch_before = fetch_before
+        self.max_rows = max_pages * page_size
+        self.rows: dict[int, Any] = {}
+        # Cursor keys of the loaded rows, in tree order.
+        self._keys: list[Any] = []
+        self._cursor: Any = None
+        self._exhausted = False
+        # False once pages have been dropped from the top of the window.
+        self._at_start = True
+        self._pending: str | None = None
+        tree.configure(yscrollcommand=self._on_yscroll)
+
+    def reset(self, fetch_page: FetchPage | None = None) -> None:
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        if self._pending:
+            self.tree.after_cancel(self._pending)
+            self._pending = None
+        self.tree.delete(*self.tree.get_children())
+        self.rows.clear()
+        self._keys.clear()
+        self._cursor = None
+        self._exhausted = False
+        self._at_start = True
+        self.load_more()
+
+    def load_more(self) -> None:
+        self._pending = None
+        if self._exhausted:
+            return
+        rows = self.fetch_page(self._cursor, self.page_size)
+        for row in rows:
+            row_id = self.row_id(row)
+            if row_id in self.rows:
+                continue
+            self.rows[row_id] = row
+            self._keys.append(self.cursor_of(row))
+            self.tree.insert("", "end", iid=row_id, values=self.to_values(row))
+        if rows:
+            self._cursor = self.cursor_of(rows[-1])
+        self._exhausted = len(rows) < self.page_size
+        if self.fetch_before is not None and len(self._keys) > self.max_rows:
+            self._drop(len(self._keys) - self.max_rows, from_top=True)
+
+    def load_previous(self) -> None:
+        """Fetch the page above the first loaded row and drop pages past the window's bottom."""
+        self._pending = None
+        if self._at_start or self.fetch_before is None or not self._keys:
+            return
+        rows = self.fetch_before(self._keys[0], self.page_size)
+        keys: list[Any] = []
+        for row in rows:
+            row_id = self.row_id(row)
+            if row_id in self.rows:
+                continue
+            self.rows[row_id] = row
+            self.tree.insert("", len(keys), iid=row_id, values=self.to_values(row))
+            keys.append(self.cursor_of(row))
+        self._keys[:0] = keys
+        # Keep the rows the user was looking at in place.
+        self.tree.yview_scroll(len(keys), "units")
+        self._at_start = len(rows) < self.page_size
+        if len(self._keys) > self.max_rows:
+            self._drop(len(self._keys) - self.max_rows, from_top=False)
+
+    def _drop(self, count: int, from_top: bool) -> None:
+        items = self.tree.get_children()
+        if from_top:
+            doomed, self._keys[:count] = items[:count], []
+            self._at_start = False
+        else:
+            doomed, self._keys[-count:] = items[-count:], []
+            self._cursor = self._keys[-1]
+            self._exhausted = False
+        for row_id in doomed:
+            del self.rows[int(row_id)]
+        self.tree.delete(*doomed)
+        if from_top:
+            self.tree.yview_scroll(-count, "units")
+
+    def get(self, row_id: int) -> Any | None:
+        return self.rows.get(row_id)
+
+    def upsert(self, row: Any) -> None:
+        """Insert ``row`` or move it to its sorted place; rows outside the loaded pages are left to paging."""
+        row_id = self.row_id(row)
+        key = self.cursor_of(row)
+        old = self.rows.get(row_id)
+        past_end = not self._exhausted and (self._cursor is None or key > self._cursor)
+        before_start = not self._at_start and bool(self._keys) and key < self._keys[0]
+        if past_end or before_start:
+            if old is not None:
+                self.remove(row_id)
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, self.cursor_of(old))]
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self.rows[row_id] = row
+        if old is None:
+            self.tree.insert("", index, iid=row_id, values=self.to_values(row))
+        else:
+            self.tree.item(row_id, values=self.to_values(row))
+            self.tree.move(row_id, "", index)
+
+    def remove(self, row_id: int) -> None:
+        row = self.rows.pop(row_id, None)
+        if row is None:
+            return
+        del self._keys[bisect_left(self._keys, self.cursor_of(row))]
+        self.tree.delete(row_id)
+        if not self._keys and not self._at_start:
+            self.reset()
+
+    def _on_yscroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        if self._pending:
+            return
+        if not self._exhausted and float(last) >= self.prefetch_at:
+            self._pending = self.tree.after_idle(self.load_more)
+        elif not self._at_start and float(first) <= 1 - self.prefetch_at:
+            self._pending = self.tree.after_idle(self.load_previous)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import tkinter as tk
+
+
+class TaskCancelled(Exception):
+    """Raised inside a job from ``TaskHandle.report`` once cancellation was requested."""
+
+
+class TaskHandle:
+    """Handed to every job; lets it report progress and notice cancellation."""
+
+    def __init__(self, runner: "TaskRunner", title: str, on_progress: Callable[[int, int | None], None] | None):
+        self.title = title
+        self._runner = runner
+        self._on_progress = on_progress
+        self._cancelled = threading.Event()
+        self.done = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def report(self, done: int, total: int | None = None) -> None:
+        """Progress callback for services; raises ``TaskCancelled`` when the user cancelled."""
+        if self.cancelled:
+            raise TaskCancelled()
+        if self._on_progress:
+            self._runner.post(self._on_progress, done, total)
+
+
+class TaskRunner:
+    """Run service calls on a worker pool and marshal callbacks back to Tk.
+
+    Workers never touch widgets: results, errors and progress updates are
+    queued and drained on the Tk thread with ``after()``.
+    """
+
+    def __init__(self, widget: tk.Misc, max_workers: int = 2, poll_ms: int = 50):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="family-task")
+        self._callbacks: queue.SimpleQueue[tuple[Callable, tuple]] = queue.SimpleQueue()
+        self._active: set[TaskHandle] = set()
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._active)
+
+    def submit(
+        self,
+        job: Callable[[TaskHandle], Any],
+        title: str = "",
+        on_success: Callable[[Any], None] | None = None,
+        on_error: Callable[[BaseException], None] | None = None,
+        on_progress: Callable[[int, int | None], None] | None = None,
+        on_finish: Callable[[TaskHandle], None] | None = None,
+    ) -> TaskHandle:
+        handle = TaskHandle(self, title, on_progress)
+        self._active.add(handle)
+        self._executor.submit(self._run, handle, job, on_success, on_error, on_finish)
+        self._schedule_poll()
+        return handle
+
+    def post(self, callback: Callable, *args) -> None:
+        """Queue ``callback(*args)`` for the Tk thread; safe to call from a running job."""
+        self._callbacks.put((callback, args))
+
+    def cancel_all(self) -> None:
+        for handle in list(self._active):
+            handle.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, handle: TaskHandle, job, on_success, on_error, on_finish) -> None:
+        try:
+            result = job(handle)
+        except TaskCancelled:
+            pass
+        except Exception as exc:  # surfaced to the UI through on_error
+            if on_error and not handle.cancelled:
+                self.post(on_error, exc)
+        else:
+            # A cancelled job that could not be interrupted still finishes; drop its result.
+            if on_success and not handle.cancelled:
+                self.post(on_success, result)
+        finally:
+            self.post(self._finish, handle, on_finish)
+
+    def _finish(self, handle: TaskHandle, on_finish) -> None:
+        handle.done = True
+        self._active.discard(handle)
+        if on_finish:
+            on_finish(handle)
+
+    def _schedule_poll(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        try:
+            while True:
+                try:
+                    callback, args = self._callbacks.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            try:
+                if self._active or not self._callbacks.empty():
+                    self.widget.after(self.poll_ms, self._poll)
+                else:
+                    self._polling = False
+            except tk.TclError:
+                # Widget destroyed while jobs were still queued.
+                self._polling = False
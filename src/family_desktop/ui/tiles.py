@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+TILE_SIZE = 256
+
+
+@dataclass(slots=True)
+class TilePlacement:
+    col: int
+    row: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class TilePyramid:
+    """Power-of-two downsampled copies of a diagram, cut into tiles on demand.
+
+    Level 0 is the full image and every further level halves it. For a zoom
+    factor the viewer picks the smallest level that is still at least as
+    detailed as the screen, so only a handful of small tiles ever get
+    resampled, whatever the size of the source PNG.
+    """
+
+    def __init__(self, image: Image.Image, tile_size: int = TILE_SIZE, max_cached_tiles: int = 256):
+        self.tile_size = tile_size
+        self.max_cached_tiles = max_cached_tiles
+        # ``reduce`` only handles these modes; Graphviz may write palette PNGs.
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        self.levels: list[Image.Image] = [image]
+        while max(self.levels[-1].size) > tile_size:
+            self.levels.append(self.levels[-1].reduce(2))
+        self._tiles: OrderedDict[tuple[int, int, int], Image.Image] = OrderedDict()
+
+    @property
+    def width(self) -> int:
+        return self.levels[0].width
+
+    @property
+    def height(self) -> int:
+        return self.levels[0].height
+
+    def level_for(self, zoom: float) -> int:
+        if zoom >= 1:
+            return 0
+        return min(int(math.floor(math.log2(1 / zoom))), len(self.levels) - 1)
+
+    def scale_for(self, level: int, zoom: float) -> float:
+        return zoom * self.width / self.levels[level].width
+
+    def tile(self, level: int, col: int, row: int) -> Image.Image:
+        key = (level, col, row)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles.move_to_end(key)
+            return cached
+        source = self.levels[level]
+        left, top = col * self.tile_size, row * self.tile_size
+        box = (left, top, min(left + self.tile_size, source.width), min(top + self.tile_size, source.height))
+        tile = source.crop(box)
+        self._tiles[key] = tile
+        if len(self._tiles) > self.max_cached_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def visible_tiles(
+        self, level: int, scale: float, left: float, top: float, width: float, height: float
+    ) -> list[TilePlacement]:
+        """Tiles of ``level`` drawn at ``scale`` that intersect the given view rectangle.
+
+        Coordinates are relative to the image origin at the current zoom. Tile
+        edges are rounded from the same grid so neighbouring tiles never leave
+        a seam.
+        """
+        source = self.levels[level]
+        span = self.tile_size * scale
+        first_col = max(int(left // span), 0)
+        first_row = max(int(top // span), 0)
+        last_col = min(int((left + width) // span), math.ceil(source.width / self.tile_size) - 1)
+        last_row = min(int((top + height) // span), math.ceil(source.height / self.tile_size) - 1)
+        placements = []
+        for row in range(first_row, last_row + 1):
+            y0 = round(row * span)
+            y1 = round(min((row + 1) * self.tile_size, source.height) * scale)
+            for col in range(first_col, last_col + 1):
+                x0 = round(col * span)
+                x1 = round(min((col + 1) * self.tile_size, source.width) * scale)
+                if x1 > x0 and y1 > y0:
+                    placements.append(TilePlacement(col, row, x0, y0, x1 - x0, y1 - y0))
+        return placements
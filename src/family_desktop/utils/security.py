@@ -1,22 +1,46 @@
 from __future__ import annotations
 
 import hashlib
-import os
 import secrets
 
+from ..config import settings
 
-def hash_password(password: str, salt: bytes | None = None) -> str:
+ALGORITHM = "pbkdf2_sha256"
+# Hashes written before the versioned format were ``salt:hash`` with this cost.
+LEGACY_ITERATIONS = 100_000
+
+
+def hash_password(password: str, salt: bytes | None = None, iterations: int | None = None) -> str:
+    """Return ``pbkdf2_sha256$<iterations>$<salt>$<hash>`` so the cost can change later."""
     salt = salt or secrets.token_bytes(16)
-    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 100_000)
-    return salt.hex() + ":" + hashed.hex()
+    iterations = iterations or settings.password_iterations
+    hashed = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${hashed.hex()}"
 
 
-def verify_password(password: str, stored: str) -> bool:
+def _parse(stored: str) -> tuple[str, int, bytes, str] | None:
     try:
+        if "$" in stored:
+            algorithm, iterations, salt_hex, hash_hex = stored.split("$")
+            return algorithm, int(iterations), bytes.fromhex(salt_hex), hash_hex
         salt_hex, hash_hex = stored.split(":")
+        return ALGORITHM, LEGACY_ITERATIONS, bytes.fromhex(salt_hex), hash_hex
     except ValueError:
+        return None
+
+
+def verify_password(password: str, stored: str) -> bool:
+    parsed = _parse(stored)
+    if parsed is None or parsed[0] != ALGORITHM or parsed[1] < 1:
         return False
-    salt = bytes.fromhex(salt_hex)
-    new_hash = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 100_000)
+    _, iterations, salt, hash_hex = parsed
+    new_hash = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     return secrets.compare_digest(hash_hex, new_hash.hex())
 
+
+def needs_rehash(stored: str) -> bool:
+    """True for legacy hashes and hashes made with a different cost than configured."""
+    if "$" not in stored:
+        return True
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] != ALGORITHM or parsed[1] != settings.password_iterations